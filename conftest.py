@@ -0,0 +1,42 @@
+"""
+Shared pytest fixtures for the root-level test modules.
+"""
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def user_mgr(tmp_path_factory):
+    """UserManager on a throwaway database, shared by the tests of a module."""
+    from src.authorization import UserManager
+
+    mgr = UserManager(db_path=tmp_path_factory.mktemp("auth") / "users.db")
+    yield mgr
+    mgr.close()
+
+
+@pytest.fixture(scope="module")
+def audit_logger(tmp_path_factory):
+    """AuditLogger on a throwaway database, shared by the tests of a module."""
+    from src.authorization import AuditLogger
+
+    logger = AuditLogger(db_path=tmp_path_factory.mktemp("audit") / "audit.db")
+    yield logger
+    logger.close()
+
+
+@pytest.fixture(scope="session")
+def pii_detector():
+    """PIIDetector instance (stateless, so shared by the whole session)."""
+    from src.authorization import PIIDetector
+
+    return PIIDetector()
+
+
+@pytest.fixture(scope="module")
+def admin_session(user_mgr):
+    """Session token for the default admin, authenticated once per module."""
+    admin = user_mgr.authenticate("admin", "admin")
+    session_id = user_mgr.create_session(admin, ip_address="127.0.0.1")
+    yield session_id
+    user_mgr.delete_session(session_id)
@@ -15,13 +15,21 @@ Usage:
     python dashboard_api.py --port 8080 --audit-dir data
 """
 import argparse
+import functools
 import json
 import glob
+import re
 import traceback
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+from collections import Counter, defaultdict
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 try:
     from flask import Flask, jsonify, request, send_from_directory
@@ -222,27 +230,63 @@ def check_document_access(user, document):
     return policy_engine.check_access(user_context, doc_context)
 
 
-def load_audit_entries(days: Optional[int] = None, pattern: str = "routing_audit_*.jsonl") -> List[Dict[str, Any]]:
-    """Load audit entries from JSONL files, optionally filtered by date range."""
+# Daily-rotated audit files, named for the UTC day they were written
+_AUDIT_FILE_RE = re.compile(r"routing_audit_(\d{4}-\d{2}-\d{2})\.jsonl$")
+
+
+@functools.lru_cache(maxsize=128)
+def _read_audit_file(path: str, mtime_ns: int, size: int) -> Tuple[Dict[str, Any], ...]:
+    """Parse one audit JSONL file.
+    
+    Cached per (path, mtime, size), so unchanged files are parsed once; the
+    returned entries are shared between callers and must not be mutated.
+    Parsing stops at the first malformed line.
+    """
+    loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+    entries = []
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(loads(line))
+            except ValueError:
+                break
+    return tuple(entries)
+
+
+def load_audit_entries(days: Optional[int] = None, pattern: str = "routing_audit_*.jsonl",
+                       doc_type_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Load audit entries from JSONL files, optionally filtered by date range and document type."""
     entries = []
     cutoff = None
     if days is not None:
         cutoff = datetime.utcnow() - timedelta(days=days)
+        cutoff_day = cutoff.strftime("%Y-%m-%d")
     
     files = sorted(AUDIT_DIR.glob(pattern))
     for fpath in files:
+        if cutoff:
+            # A daily file only holds entries stamped on or before its day,
+            # so files from before the cutoff day need not be opened
+            match = _AUDIT_FILE_RE.search(fpath.name)
+            if match and match.group(1) < cutoff_day:
+                continue
         try:
-            with fpath.open("r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    entry = json.loads(line)
-                    if cutoff:
-                        ts = datetime.fromisoformat(entry.get("timestamp", ""))
-                        if ts < cutoff:
-                            continue
-                    entries.append(entry)
+            stat = fpath.stat()
+            file_entries = _read_audit_file(str(fpath), stat.st_mtime_ns, stat.st_size)
+            if doc_type_filter:
+                # Cheap key check first, so other types skip timestamp parsing
+                file_entries = [e for e in file_entries if e.get("doc_type") == doc_type_filter]
+            if not cutoff:
+                entries.extend(file_entries)
+                continue
+            for entry in file_entries:
+                ts = datetime.fromisoformat(entry.get("timestamp", ""))
+                if ts < cutoff:
+                    continue
+                entries.append(entry)
         except Exception:
             continue
     return entries
@@ -263,22 +307,37 @@ def compute_summary(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
         }
     
     total = len(entries)
-    severity_counts = Counter(e.get("severity") for e in entries)
-    route_counts = Counter(e.get("route") for e in entries)
-    doc_type_counts = Counter(e.get("doc_type") for e in entries)
-    operator_counts = Counter(e.get("operator_id") for e in entries)
-    
-    class_confs = [e.get("classification_confidence") for e in entries if e.get("classification_confidence") is not None]
-    field_confs = [e.get("avg_field_confidence") for e in entries if e.get("avg_field_confidence") is not None]
-    avg_class = sum(float(c) for c in class_confs) / len(class_confs) if class_confs else None  # type: ignore[arg-type]
-    avg_field = sum(float(c) for c in field_confs) / len(field_confs) if field_confs else None  # type: ignore[arg-type]
-    
+    severity_counts: Counter = Counter()
+    route_counts: Counter = Counter()
+    doc_type_counts: Counter = Counter()
+    operator_counts: Counter = Counter()
     reason_counter: Counter = Counter()
+    class_sum = field_sum = 0.0
+    class_n = field_n = 0
+    
+    # Single pass over the entries for all counters and averages
     for e in entries:
+        severity_counts[e.get("severity")] += 1
+        route_counts[e.get("route")] += 1
+        doc_type_counts[e.get("doc_type")] += 1
+        operator_counts[e.get("operator_id")] += 1
+        
+        class_conf = e.get("classification_confidence")
+        if class_conf is not None:
+            class_sum += float(class_conf)
+            class_n += 1
+        field_conf = e.get("avg_field_confidence")
+        if field_conf is not None:
+            field_sum += float(field_conf)
+            field_n += 1
+        
         reasons = e.get("reasons", [])
         if isinstance(reasons, list):
             reason_counter.update(reasons)
     
+    avg_class = class_sum / class_n if class_n else None
+    avg_field = field_sum / field_n if field_n else None
+    
     return {
         "total": total,
         "severity": dict(severity_counts),
@@ -462,11 +521,9 @@ def routing_summary():
     severity_filter = request.args.get("severity")
     operator_filter = request.args.get("operator")
     
-    entries = load_audit_entries(days=days)
+    entries = load_audit_entries(days=days, doc_type_filter=doc_type_filter)
     
     # Apply filters
-    if doc_type_filter:
-        entries = [e for e in entries if e.get("doc_type") == doc_type_filter]
     if severity_filter:
         entries = [e for e in entries if e.get("severity") == severity_filter]
     if operator_filter:
@@ -510,17 +567,16 @@ def routing_trends():
     days = request.args.get("days", default=30, type=int)
     entries = load_audit_entries(days=days)
     
-    # Group by date
-    daily_stats: Dict[str, Dict[str, Any]] = {}
+    # Group by date; ISO timestamps start with a sortable YYYY-MM-DD
+    daily_stats: Dict[str, Dict[str, int]] = defaultdict(
+        lambda: {"total": 0, "qc": 0, "manual": 0, "auto": 0}
+    )
     for e in entries:
-        ts = e.get("timestamp", "")
-        date = ts.split("T")[0] if "T" in ts else ts[:10]
-        if date not in daily_stats:
-            daily_stats[date] = {"total": 0, "qc": 0, "manual": 0, "auto": 0}
-        daily_stats[date]["total"] += 1
+        day = daily_stats[e.get("timestamp", "")[:10]]
+        day["total"] += 1
         severity = e.get("severity", "auto")
-        if severity in daily_stats[date]:
-            daily_stats[date][severity] += 1
+        if severity in day:
+            day[severity] += 1
     
     # Convert to sorted list
     trend_data = [{"date": k, **v} for k, v in sorted(daily_stats.items())]
@@ -1015,6 +1071,34 @@ def archive_years():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/api/archive/facets', methods=['GET'])
+def archive_facets():
+    """Get owners, document types and years in the archive in one request."""
+    if not ORGANIZATION_AVAILABLE:
+        return jsonify({"error": "Organization modules not available"}), 503
+    
+    indexer = get_archive_indexer()
+    if not indexer:
+        return jsonify({"error": "Archive indexer not available"}), 503
+    
+    try:
+        # One statistics query covers all three lookup lists
+        stats = indexer.get_statistics()
+        
+        indexer.close()
+        
+        return jsonify({
+            "status": "ok",
+            "owners": sorted(stats.get("by_owner", {}).keys()),
+            "doc_types": sorted(stats.get("by_doc_type", {}).keys()),
+            "years": sorted(stats.get("by_year", {}).keys(), reverse=True)
+        })
+    except Exception as e:
+        if indexer:
+            indexer.close()
+        return jsonify({"error": str(e)}), 500
+
+
 def main():
     parser = argparse.ArgumentParser(description="Routing Dashboard API Server")
     parser.add_argument("--port", "-p", type=int, default=8080, help="Server port (default: 8080)")
@@ -1124,6 +1208,7 @@ def main():
         print(f"  Archive Owners: http://{args.host}:{args.port}/api/archive/owners")
         print(f"  Archive Doc Types: http://{args.host}:{args.port}/api/archive/doc_types")
         print(f"  Archive Years: http://{args.host}:{args.port}/api/archive/years")
+        print(f"  Archive Facets: http://{args.host}:{args.port}/api/archive/facets")
         print(f"  Archive Merge (POST): http://{args.host}:{args.port}/api/archive/merge")
         print(f"  Archive Thumbnails (POST): http://{args.host}:{args.port}/api/archive/thumbnails/generate")
         print(f"  Thumbnail Stats: http://{args.host}:{args.port}/api/archive/thumbnail/cache/stats")
@@ -4,13 +4,22 @@ Audit Logger - Document Access Audit Trail
 Tracks all document access events for compliance and security monitoring.
 """
 
+import contextlib
+import hashlib
 import sqlite3
 import json
+import threading
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterable, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 class AuditAction(Enum):
     """Types of auditable actions."""
@@ -25,6 +34,33 @@ class AuditAction(Enum):
     EXPORT = "export"
 
 
+# Event columns covered by the hash chain, in insert order
+_ROW_COLUMNS = (
+    'timestamp', 'user_id', 'username', 'action', 'resource_type',
+    'resource_id', 'allowed', 'ip_address', 'user_agent',
+    'session_id', 'metadata', 'created_at'
+)
+
+def _dumps_metadata(metadata: Dict[str, Any]) -> str:
+    """Serialize event metadata (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(metadata, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(metadata)
+
+
+def _loads_metadata(text: str) -> Dict[str, Any]:
+    """Parse stored event metadata (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+_INSERT_EVENT = f"""
+    INSERT INTO audit_events ({', '.join(_ROW_COLUMNS)}, prev_hash, row_hash)
+    VALUES ({', '.join('?' * (len(_ROW_COLUMNS) + 2))})
+"""
+
+
 class AuditLogger:
     """
     Audit logger for tracking document access and operations.
@@ -35,6 +71,8 @@ class AuditLogger:
     - IP address and metadata capture
     - Retention policy management
     - Query and reporting capabilities
+    - Tamper evidence: each event stores the SHA-256 of the previous
+      event's hash plus its own fields (see verify_chain)
     """
     
     def __init__(
@@ -55,8 +93,33 @@ class AuditLogger:
         
         self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
+        
+        # WAL lets readers run alongside the writer; NORMAL syncs at
+        # checkpoints instead of on every commit
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        
+        # The connection is shared across threads; reading the chain head,
+        # inserting and committing happen under this lock so concurrent
+        # events can't chain onto the same predecessor. batch() holds it for
+        # the whole block, so other threads never write into its transaction
+        self._lock = threading.RLock()
+        
+        # Per-thread nesting depth of batch() blocks; commits are deferred
+        # while > 0
+        self._batch_state = threading.local()
+        
         self._create_tables()
     
+    @property
+    def _batch_depth(self) -> int:
+        return getattr(self._batch_state, 'depth', 0)
+    
+    @_batch_depth.setter
+    def _batch_depth(self, depth: int):
+        self._batch_state.depth = depth
+    
     def _create_tables(self):
         """Create database tables."""
         cursor = self.conn.cursor()
@@ -76,10 +139,18 @@ class AuditLogger:
                 user_agent TEXT,
                 session_id TEXT,
                 metadata TEXT,
-                created_at REAL NOT NULL
+                created_at REAL NOT NULL,
+                prev_hash BLOB,
+                row_hash BLOB
             )
         """)
         
+        # Add the hash chain columns to databases created before them
+        columns = {row['name'] for row in cursor.execute("PRAGMA table_info(audit_events)")}
+        for column in ('prev_hash', 'row_hash'):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE audit_events ADD COLUMN {column} BLOB")
+        
         # Create indexes for common queries
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_audit_timestamp 
@@ -129,16 +200,63 @@ class AuditLogger:
         Returns:
             Event ID
         """
+        row = self._make_row(
+            datetime.utcnow().timestamp(), user_id, username, action,
+            document_id, allowed, ip_address, user_agent, session_id, metadata
+        )
+        with self._lock:
+            prev_hash = self._last_hash()
+            
+            cursor = self.conn.cursor()
+            cursor.execute(_INSERT_EVENT, row + (prev_hash, self._chain_hash(prev_hash, row)))
+            
+            if not self._batch_depth:
+                self.conn.commit()
+            return cursor.lastrowid
+    
+    def log_many(self, events: Iterable[Dict[str, Any]]) -> int:
+        """
+        Log several access events in one insert and one commit.
+        
+        Args:
+            events: Dictionaries of log_access keyword arguments
+            
+        Returns:
+            Number of events logged
+        """
         timestamp = datetime.utcnow().timestamp()
+        rows = [self._make_row(timestamp, **event) for event in events]
         
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO audit_events (
-                timestamp, user_id, username, action, resource_type,
-                resource_id, allowed, ip_address, user_agent,
-                session_id, metadata, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        with self._lock:
+            prev_hash = self._last_hash()
+            
+            chained = []
+            for row in rows:
+                row_hash = self._chain_hash(prev_hash, row)
+                chained.append(row + (prev_hash, row_hash))
+                prev_hash = row_hash
+            
+            self.conn.executemany(_INSERT_EVENT, chained)
+            
+            if not self._batch_depth:
+                self.conn.commit()
+        return len(chained)
+    
+    @staticmethod
+    def _make_row(
+        timestamp: float,
+        user_id: str,
+        username: str,
+        action: str,
+        document_id: str,
+        allowed: bool = True,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        session_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Tuple:
+        """Build the _ROW_COLUMNS values for an event."""
+        return (
             timestamp,
             user_id,
             username,
@@ -149,12 +267,76 @@ class AuditLogger:
             ip_address,
             user_agent,
             session_id,
-            json.dumps(metadata) if metadata else None,
+            _dumps_metadata(metadata) if metadata else None,
             timestamp
-        ))
+        )
+    
+    @staticmethod
+    def _chain_hash(prev_hash: bytes, row: Tuple) -> bytes:
+        """Hash an event's fields onto the previous event's hash."""
+        payload = json.dumps(row, separators=(',', ':')).encode()
+        return hashlib.sha256(prev_hash + payload).digest()
+    
+    def _last_hash(self) -> bytes:
+        """Hash of the newest event (empty for an empty or pre-chain log)."""
+        row = self.conn.execute(
+            "SELECT row_hash FROM audit_events ORDER BY event_id DESC LIMIT 1"
+        ).fetchone()
+        return (row['row_hash'] or b'') if row else b''
+    
+    def verify_chain(self) -> Optional[int]:
+        """
+        Check the hash chain over all chained events.
         
-        self.conn.commit()
-        return cursor.lastrowid
+        Events removed by cleanup_old_events only shorten the chain; the
+        oldest remaining event is taken as its start.
+        
+        Returns:
+            event_id of the first event that fails verification, or None
+            if the chain is intact
+        """
+        cursor = self.conn.execute(
+            "SELECT * FROM audit_events WHERE row_hash IS NOT NULL ORDER BY event_id"
+        )
+        
+        expected_prev = None
+        for row in cursor:
+            if expected_prev is not None and row['prev_hash'] != expected_prev:
+                return row['event_id']
+            values = tuple(row[column] for column in _ROW_COLUMNS)
+            if self._chain_hash(row['prev_hash'], values) != row['row_hash']:
+                return row['event_id']
+            expected_prev = row['row_hash']
+        
+        return None
+    
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Group several log calls into a single transaction.
+        
+        Events logged inside the block are committed once on exit, or
+        rolled back together if the block raises. Other threads' log calls
+        wait until the block ends.
+        
+        Example:
+            with logger.batch():
+                logger.log_access(...)
+                logger.log_search(...)
+        """
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.conn.rollback()
+                raise
+            
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.conn.commit()
     
     def log_search(
         self,
@@ -232,15 +414,21 @@ class AuditLogger:
         
         cursor.execute(query, params)
         
-        events = []
-        for row in cursor.fetchall():
-            event = dict(row)
-            if event['metadata']:
-                event['metadata'] = json.loads(event['metadata'])
-            events.append(event)
+        events = [self._row_to_event(row) for row in cursor.fetchall()]
         
         return events
     
+    @staticmethod
+    def _row_to_event(row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert an audit_events row to an event dictionary."""
+        event = dict(row)
+        if event['metadata']:
+            event['metadata'] = _loads_metadata(event['metadata'])
+        for column in ('prev_hash', 'row_hash'):
+            if event[column] is not None:
+                event[column] = event[column].hex()
+        return event
+    
     def get_document_access_history(
         self,
         document_id: str,
@@ -264,12 +452,7 @@ class AuditLogger:
             LIMIT ?
         """, (document_id, limit))
         
-        events = []
-        for row in cursor.fetchall():
-            event = dict(row)
-            if event['metadata']:
-                event['metadata'] = json.loads(event['metadata'])
-            events.append(event)
+        events = [self._row_to_event(row) for row in cursor.fetchall()]
         
         return events
     
@@ -309,12 +492,7 @@ class AuditLogger:
                 LIMIT ?
             """, (cutoff, limit))
         
-        events = []
-        for row in cursor.fetchall():
-            event = dict(row)
-            if event['metadata']:
-                event['metadata'] = json.loads(event['metadata'])
-            events.append(event)
+        events = [self._row_to_event(row) for row in cursor.fetchall()]
         
         return events
     
@@ -406,10 +584,11 @@ class AuditLogger:
         """
         cutoff = (datetime.utcnow() - timedelta(days=self.retention_days)).timestamp()
         
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM audit_events WHERE timestamp < ?", (cutoff,))
-        deleted = cursor.rowcount
-        self.conn.commit()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM audit_events WHERE timestamp < ?", (cutoff,))
+            deleted = cursor.rowcount
+            self.conn.commit()
         
         return deleted
     
@@ -448,13 +627,11 @@ class AuditLogger:
         
         cursor.execute(query, params)
         
-        events = []
-        for row in cursor.fetchall():
-            event = dict(row)
-            if event['metadata']:
-                event['metadata'] = json.loads(event['metadata'])
-            events.append(event)
+        events = [self._row_to_event(row) for row in cursor.fetchall()]
         
+        if ORJSON_AVAILABLE:
+            Path(output_path).write_bytes(orjson.dumps(events, option=orjson.OPT_INDENT_2))
+            return
         with open(output_path, 'w') as f:
             json.dump(events, f, indent=2)
     
@@ -21,6 +21,9 @@ except ImportError:
     print("Warning: cryptography not installed. Encryption disabled.")
     print("Install via: pip install cryptography")
 
+# Read size for streaming file encryption/decryption
+FILE_CHUNK_SIZE = 1024 * 1024
+
 
 class EncryptionManager:
     """
@@ -103,6 +106,19 @@ class EncryptionManager:
         combined = self.master_key + context.encode()
         return hashlib.sha256(combined).digest()
     
+    def _cipher(self, context: str, iv: bytes) -> "Cipher":
+        """
+        Create an AES-256-CBC cipher for a context.
+        
+        Args:
+            context: Context string for key derivation
+            iv: Initialization vector
+            
+        Returns:
+            Cipher object
+        """
+        return Cipher(algorithms.AES(self._derive_key(context)), modes.CBC(iv), backend=default_backend())
+    
     def encrypt_file(
         self,
         input_path: Path,
@@ -125,29 +141,32 @@ class EncryptionManager:
         
         # Use document ID or filename for key derivation
         context = document_id or input_path.name
-        derived_key = self._derive_key(context)
         
         # Generate random IV (16 bytes for AES)
         iv = os.urandom(16)
         
-        # Read input file
-        plaintext = input_path.read_bytes()
-        
-        # Pad plaintext to block size (128 bits = 16 bytes)
+        # Pad to block size (128 bits = 16 bytes) and encrypt chunk by chunk
         padder = padding.PKCS7(128).padder()
-        padded_plaintext = padder.update(plaintext) + padder.finalize()
+        encryptor = self._cipher(context, iv).encryptor()
         
-        # Encrypt
-        cipher = Cipher(
-            algorithms.AES(derived_key),
-            modes.CBC(iv),
-            backend=default_backend()
-        )
-        encryptor = cipher.encryptor()
-        ciphertext = encryptor.update(padded_plaintext) + encryptor.finalize()
+        original_size = 0
+        encrypted_size = len(iv)
         
         # Write encrypted file (IV + ciphertext)
-        output_path.write_bytes(iv + ciphertext)
+        with open(input_path, 'rb') as src, open(output_path, 'wb') as dst:
+            dst.write(iv)
+            while True:
+                chunk = src.read(FILE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                original_size += len(chunk)
+                encrypted = encryptor.update(padder.update(chunk))
+                encrypted_size += len(encrypted)
+                dst.write(encrypted)
+            
+            encrypted = encryptor.update(padder.finalize()) + encryptor.finalize()
+            encrypted_size += len(encrypted)
+            dst.write(encrypted)
         
         # Return metadata
         return {
@@ -156,8 +175,8 @@ class EncryptionManager:
             'document_id': context,
             'algorithm': 'AES-256-CBC',
             'iv': b64encode(iv).decode(),
-            'encrypted_size': len(iv + ciphertext),
-            'original_size': len(plaintext)
+            'encrypted_size': encrypted_size,
+            'original_size': original_size
         }
     
     def decrypt_file(
@@ -186,30 +205,26 @@ class EncryptionManager:
         
         # Use document ID or filename for key derivation
         context = document_id or input_path.name.replace('.encrypted', '')
-        derived_key = self._derive_key(context)
-        
-        # Read encrypted file
-        encrypted_data = input_path.read_bytes()
         
-        # Extract IV (first 16 bytes)
-        iv = encrypted_data[:16]
-        ciphertext = encrypted_data[16:]
-        
-        # Decrypt
-        cipher = Cipher(
-            algorithms.AES(derived_key),
-            modes.CBC(iv),
-            backend=default_backend()
-        )
-        decryptor = cipher.decryptor()
-        padded_plaintext = decryptor.update(ciphertext) + decryptor.finalize()
-        
-        # Unpad
-        unpadder = padding.PKCS7(128).unpadder()
-        plaintext = unpadder.update(padded_plaintext) + unpadder.finalize()
-        
-        # Write decrypted file
-        output_path.write_bytes(plaintext)
+        try:
+            with open(input_path, 'rb') as src, open(output_path, 'wb') as dst:
+                # Extract IV (first 16 bytes)
+                iv = src.read(16)
+                
+                # Decrypt and unpad chunk by chunk
+                decryptor = self._cipher(context, iv).decryptor()
+                unpadder = padding.PKCS7(128).unpadder()
+                while True:
+                    chunk = src.read(FILE_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dst.write(unpadder.update(decryptor.update(chunk)))
+                
+                dst.write(unpadder.update(decryptor.finalize()) + unpadder.finalize())
+        except Exception:
+            # Don't leave partial plaintext behind (e.g. wrong key / bad padding)
+            output_path.unlink(missing_ok=True)
+            raise
         
         return output_path
     
@@ -224,7 +239,6 @@ class EncryptionManager:
         Returns:
             Encrypted data (IV + ciphertext)
         """
-        derived_key = self._derive_key(context)
         iv = os.urandom(16)
         
         # Pad data
@@ -232,12 +246,7 @@ class EncryptionManager:
         padded_data = padder.update(data) + padder.finalize()
         
         # Encrypt
-        cipher = Cipher(
-            algorithms.AES(derived_key),
-            modes.CBC(iv),
-            backend=default_backend()
-        )
-        encryptor = cipher.encryptor()
+        encryptor = self._cipher(context, iv).encryptor()
         ciphertext = encryptor.update(padded_data) + encryptor.finalize()
         
         return iv + ciphertext
@@ -253,19 +262,12 @@ class EncryptionManager:
         Returns:
             Decrypted data
         """
-        derived_key = self._derive_key(context)
-        
         # Extract IV and ciphertext
         iv = encrypted_data[:16]
         ciphertext = encrypted_data[16:]
         
         # Decrypt
-        cipher = Cipher(
-            algorithms.AES(derived_key),
-            modes.CBC(iv),
-            backend=default_backend()
-        )
-        decryptor = cipher.decryptor()
+        decryptor = self._cipher(context, iv).decryptor()
         padded_data = decryptor.update(ciphertext) + decryptor.finalize()
         
         # Unpad
@@ -5,10 +5,23 @@ Detects PII in text and automatically escalates document confidentiality level.
 """
 
 import re
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Optional, Iterable
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
 
 class PIIType(Enum):
     """Types of PII that can be detected."""
@@ -48,6 +61,144 @@ class PIIMatch:
         }
 
 
+# Regex patterns for PII detection, in match priority order (most specific
+# first, since one combined pattern reports a single type per span)
+_PII_PATTERNS = (
+    # Email Addresses
+    (PIIType.EMAIL, r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
+    
+    # Credit Card Numbers
+    # Visa, MasterCard, Amex, Discover
+    (PIIType.CREDIT_CARD, r'\b(?:4\d{3}|5[1-5]\d{2}|6(?:011|5\d{2})|3[47]\d{2})[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b'),
+    (PIIType.CREDIT_CARD, r'\b(?:4\d{12}(?:\d{3})?|5[1-5]\d{14}|3[47]\d{13})\b'),
+    
+    # Social Security Number (SSN)
+    # Format: XXX-XX-XXXX or XXX XX XXXX or XXXXXXXXX
+    (PIIType.SSN, r'\b\d{3}[-\s]?\d{2}[-\s]?\d{4}\b'),
+    
+    # Date of Birth
+    # Formats: MM/DD/YYYY, MM-DD-YYYY, YYYY-MM-DD
+    (PIIType.DATE_OF_BIRTH, r'\b(?:0?[1-9]|1[0-2])[/-](?:0?[1-9]|[12]\d|3[01])[/-](?:19|20)\d{2}\b'),
+    (PIIType.DATE_OF_BIRTH, r'\b(?:19|20)\d{2}[/-](?:0?[1-9]|1[0-2])[/-](?:0?[1-9]|[12]\d|3[01])\b'),
+    
+    # IP Addresses
+    (PIIType.IP_ADDRESS, r'\b(?:\d{1,3}\.){3}\d{1,3}\b'),
+    
+    # Phone Numbers
+    # US format: (123) 456-7890, 123-456-7890, 123.456.7890, 1234567890
+    (PIIType.PHONE, r'\b(?:\+?1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b'),
+    (PIIType.PHONE, r'\b\d{3}[-.\s]\d{3}[-.\s]\d{4}\b'),
+    
+    # Driver's License (simplified - varies by state)
+    # Checked before passports, whose pattern is a superset of this one
+    (PIIType.DRIVERS_LICENSE, r'\b[A-Z]\d{7,8}\b'),  # Many states use this format
+    
+    # Passport Numbers (simplified - US format)
+    (PIIType.PASSPORT, r'\b[A-Z]{1,2}\d{6,9}\b'),
+)
+
+# Per-type compiled patterns
+_PATTERNS_BY_TYPE: Dict[PIIType, List[re.Pattern]] = {}
+for _pii_type, _pattern in _PII_PATTERNS:
+    _PATTERNS_BY_TYPE.setdefault(_pii_type, []).append(re.compile(_pattern))
+
+# All patterns as one alternation of named groups, compiled once (with RE2's
+# linear-time engine when available) so detection is a single scan
+_GROUP_TO_TYPE = {
+    f"{pii_type.name}_{i}": pii_type
+    for i, (pii_type, _) in enumerate(_PII_PATTERNS)
+}
+_COMBINED_PATTERN = (re2 if RE2_AVAILABLE else re).compile("|".join(
+    f"(?P<{name}>{pattern})"
+    for name, (_, pattern) in zip(_GROUP_TO_TYPE, _PII_PATTERNS)
+))
+
+
+def _build_prefilter():
+    """
+    Compile the Hyperscan database used by PIIDetector.scan_batch.
+    
+    The database only decides whether a text can contain PII at all. It
+    uses ASCII semantics for \\d, \\s and \\b like RE2 does (and like
+    Python's re does on ASCII text); \\s also covers the separators that
+    Python's re treats as whitespace.
+    
+    Returns:
+        Compiled database, or None if Hyperscan is unavailable
+    """
+    if not HYPERSCAN_AVAILABLE:
+        return None
+    
+    expressions = [
+        pattern.replace(r'\s', r'\s\x1c-\x1f').encode()
+        for _, pattern in _PII_PATTERNS
+    ]
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=hyperscan.HS_FLAG_SINGLEMATCH
+        )
+    except hyperscan.error:
+        # e.g. a CPU without the SIMD features Hyperscan requires
+        return None
+    return database
+
+
+_PREFILTER_DB = _build_prefilter()
+
+# Hyperscan scratch space can't be shared between concurrent scans
+_prefilter_local = threading.local()
+
+
+def _stop_scan(*args) -> bool:
+    """Hyperscan match handler: stop at the first candidate."""
+    return True
+
+
+def _may_contain_pii(text: str) -> bool:
+    """Check a text against the Hyperscan prefilter."""
+    if not RE2_AVAILABLE and not text.isascii():
+        # Python's re matches Unicode digits and word boundaries here
+        return True
+    
+    try:
+        data = text.encode('utf-8')
+    except UnicodeEncodeError:
+        # Lone surrogates: let the full scan decide
+        return True
+    
+    scratch = getattr(_prefilter_local, 'scratch', None)
+    if scratch is None:
+        scratch = _prefilter_local.scratch = hyperscan.Scratch(_PREFILTER_DB)
+    
+    try:
+        _PREFILTER_DB.scan(data, match_event_handler=_stop_scan, scratch=scratch)
+    except hyperscan.ScanTerminated:
+        return True
+    return False
+
+
+# Minimum confidentiality level implied by each PII type: high-confidence
+# types (see PIIDetector._calculate_confidence) require at least
+# CONFIDENTIAL (2); phone numbers and dates alone don't escalate
+_PII_LEVEL = {
+    PIIType.SSN: 2,
+    PIIType.CREDIT_CARD: 2,
+    PIIType.EMAIL: 2,
+    PIIType.IP_ADDRESS: 2,
+    PIIType.PASSPORT: 2,
+    PIIType.DRIVERS_LICENSE: 2,
+    PIIType.PHONE: 0,
+    PIIType.DATE_OF_BIRTH: 0,
+}
+
+# Per-type tokens used by redact_pii(replacement=None)
+_REDACT_TOKENS = {pii_type: f"[{pii_type.name}]" for pii_type in PIIType}
+
+
 class PIIDetector:
     """
     Detect Personal Identifiable Information (PII) in text.
@@ -61,70 +212,15 @@ class PIIDetector:
     
     def __init__(self):
         """Initialize PII detector with patterns."""
-        self.patterns = self._load_patterns()
-    
-    def _load_patterns(self) -> Dict[PIIType, List[re.Pattern]]:
-        """
-        Load regex patterns for PII detection.
-        
-        Returns:
-            Dictionary mapping PII types to regex patterns
-        """
-        patterns = {
-            # Social Security Number (SSN)
-            # Format: XXX-XX-XXXX or XXX XX XXXX or XXXXXXXXX
-            PIIType.SSN: [
-                re.compile(r'\b\d{3}[-\s]?\d{2}[-\s]?\d{4}\b'),
-            ],
-            
-            # Credit Card Numbers
-            # Visa, MasterCard, Amex, Discover
-            PIIType.CREDIT_CARD: [
-                re.compile(r'\b(?:4\d{3}|5[1-5]\d{2}|6(?:011|5\d{2})|3[47]\d{2})[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b'),
-                re.compile(r'\b(?:4\d{12}(?:\d{3})?|5[1-5]\d{14}|3[47]\d{13})\b'),
-            ],
-            
-            # Phone Numbers
-            # US format: (123) 456-7890, 123-456-7890, 123.456.7890, 1234567890
-            PIIType.PHONE: [
-                re.compile(r'\b(?:\+?1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b'),
-                re.compile(r'\b\d{3}[-.\s]\d{3}[-.\s]\d{4}\b'),
-            ],
-            
-            # Email Addresses
-            PIIType.EMAIL: [
-                re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
-            ],
-            
-            # IP Addresses
-            PIIType.IP_ADDRESS: [
-                re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b'),
-            ],
-            
-            # Date of Birth
-            # Formats: MM/DD/YYYY, MM-DD-YYYY, YYYY-MM-DD
-            PIIType.DATE_OF_BIRTH: [
-                re.compile(r'\b(?:0?[1-9]|1[0-2])[/-](?:0?[1-9]|[12]\d|3[01])[/-](?:19|20)\d{2}\b'),
-                re.compile(r'\b(?:19|20)\d{2}[/-](?:0?[1-9]|1[0-2])[/-](?:0?[1-9]|[12]\d|3[01])\b'),
-            ],
-            
-            # Passport Numbers (simplified - US format)
-            PIIType.PASSPORT: [
-                re.compile(r'\b[A-Z]{1,2}\d{6,9}\b'),
-            ],
-            
-            # Driver's License (simplified - varies by state)
-            PIIType.DRIVERS_LICENSE: [
-                re.compile(r'\b[A-Z]\d{7,8}\b'),  # Many states use this format
-            ],
-        }
-        
-        return patterns
+        self.patterns = _PATTERNS_BY_TYPE
     
     def detect(self, text: str) -> List[PIIMatch]:
         """
         Detect PII in text.
         
+        All patterns are matched in a single pass over the text; where
+        patterns overlap, the earlier entry in _PII_PATTERNS wins.
+        
         Args:
             text: Text to scan for PII
             
@@ -136,20 +232,42 @@ class PIIDetector:
         
         matches = []
         
-        for pii_type, pattern_list in self.patterns.items():
-            for pattern in pattern_list:
-                for match in pattern.finditer(text):
-                    # Validate match (basic checks)
-                    if self._validate_match(pii_type, match.group()):
-                        matches.append(PIIMatch(
-                            pii_type=pii_type,
-                            value=self._redact_value(match.group()),
-                            position=(match.start(), match.end()),
-                            confidence=self._calculate_confidence(pii_type, match.group())
-                        ))
+        for match in _COMBINED_PATTERN.finditer(text):
+            pii_type = _GROUP_TO_TYPE[match.lastgroup]
+            value = match.group()
+            # Validate match (basic checks)
+            if self._validate_match(pii_type, value):
+                matches.append(PIIMatch(
+                    pii_type=pii_type,
+                    value=self._redact_value(value),
+                    position=(match.start(), match.end()),
+                    confidence=self._calculate_confidence(pii_type, value)
+                ))
         
         return matches
     
+    def scan_batch(self, texts: Iterable[str]) -> List[List[PIIMatch]]:
+        """
+        Detect PII in a batch of texts (e.g. OCR output for many pages).
+        
+        When Hyperscan is installed, each text is first checked against a
+        SIMD multi-pattern prefilter and only candidates get the full
+        detect() pass; otherwise every text goes through detect().
+        
+        Args:
+            texts: Texts to scan
+            
+        Returns:
+            List of PIIMatch lists, in input order
+        """
+        if _PREFILTER_DB is None:
+            return [self.detect(text) for text in texts]
+        
+        return [
+            self.detect(text) if text and _may_contain_pii(text) else []
+            for text in texts
+        ]
+    
     def _validate_match(self, pii_type: PIIType, value: str) -> bool:
         """
         Validate detected match to reduce false positives.
@@ -297,40 +415,42 @@ class PIIDetector:
         
         # Determine if escalation needed
         has_pii = len(all_matches) > 0
-        high_confidence_pii = [m for m in all_matches if m.confidence >= 0.8]
+        found_types = set(m.pii_type for m in all_matches)
+        current_level = document.get('confidentiality_level', 1)
         
         result = {
             'has_pii': has_pii,
             'pii_count': len(all_matches),
-            'high_confidence_count': len(high_confidence_pii),
-            'pii_types': list(set(m.pii_type.value for m in all_matches)),
+            'high_confidence_count': sum(1 for m in all_matches if m.confidence >= 0.8),
+            'pii_types': [t.value for t in found_types],
             'matches': [m.to_dict() for m in all_matches],
             'escalated': False,
-            'original_confidentiality': document.get('confidentiality_level', 1)
+            'original_confidentiality': current_level
         }
         
-        # Escalate if high-confidence PII found
-        if high_confidence_pii:
-            current_level = document.get('confidentiality_level', 1)
-            # Escalate to at least CONFIDENTIAL (2)
-            new_level = max(current_level, 2)
-            
-            if new_level > current_level:
-                document['confidentiality_level'] = new_level
-                document['pii_detected'] = True
-                document['pii_types'] = result['pii_types']
-                result['escalated'] = True
-                result['new_confidentiality'] = new_level
+        # Escalate to the highest level required by the PII types found
+        new_level = max(current_level, max((_PII_LEVEL[t] for t in found_types), default=0))
+        
+        if new_level > current_level:
+            document['confidentiality_level'] = new_level
+            document['pii_detected'] = True
+            document['pii_types'] = result['pii_types']
+            result['escalated'] = True
+            result['new_confidentiality'] = new_level
         
         return result
     
-    def redact_pii(self, text: str, replacement: str = "[REDACTED]") -> str:
+    def redact_pii(self, text: str, replacement: Optional[str] = "[REDACTED]") -> str:
         """
         Redact PII from text.
         
+        Matches are substituted in a single pass of the combined pattern,
+        applying the same validation as detect().
+        
         Args:
             text: Original text
-            replacement: Replacement string for PII
+            replacement: Replacement string for PII, or None to use a
+                per-type token such as [SSN] or [EMAIL]
             
         Returns:
             Text with PII redacted
@@ -338,14 +458,28 @@ class PIIDetector:
         if not text:
             return text
         
-        matches = self.detect(text)
+        def _substitute(match) -> str:
+            pii_type = _GROUP_TO_TYPE[match.lastgroup]
+            value = match.group()
+            if not self._validate_match(pii_type, value):
+                return value
+            return _REDACT_TOKENS[pii_type] if replacement is None else replacement
         
-        # Sort matches by position (descending) to replace from end to start
-        matches.sort(key=lambda m: m.position[0], reverse=True)
-        
-        redacted_text = text
-        for match in matches:
-            start, end = match.position
-            redacted_text = redacted_text[:start] + replacement + redacted_text[end:]
+        return _COMBINED_PATTERN.sub(_substitute, text)
+    
+    def redact_pii_many(
+        self,
+        texts: List[str],
+        replacement: Optional[str] = "[REDACTED]"
+    ) -> List[str]:
+        """
+        Redact PII from several texts.
         
-        return redacted_text
+        Args:
+            texts: Original texts
+            replacement: Replacement string for PII (see redact_pii)
+            
+        Returns:
+            Redacted texts, in input order
+        """
+        return [self.redact_pii(text, replacement) for text in texts]
@@ -5,8 +5,10 @@ Implements flexible policy rules for document access control based on user
 and document attributes.
 """
 
+import functools
 from enum import Enum
-from typing import Dict, Any, List, Optional, Callable
+from types import CodeType
+from typing import Dict, Any, Iterator, List, Optional, Callable, Tuple
 from dataclasses import dataclass
 import re
 
@@ -67,6 +69,44 @@ class AccessRule:
     allow: bool = True  # True = allow if matched, False = deny if matched
 
 
+def _contains(lst, item) -> bool:
+    """Rule helper: membership test that tolerates non-list values."""
+    return item in lst if isinstance(lst, list) else False
+
+
+def _freeze(value: Any) -> Any:
+    """Convert dicts/lists (recursively) into hashable equivalents.
+    
+    Containers are tagged with their type, since rules can tell them apart
+    (contains() only accepts lists).
+    """
+    if isinstance(value, dict):
+        return ('dict', frozenset((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return ('list', tuple(_freeze(v) for v in value))
+    if isinstance(value, tuple):
+        return ('tuple', tuple(_freeze(v) for v in value))
+    if isinstance(value, set):
+        return ('set', frozenset(_freeze(v) for v in value))
+    return value
+
+
+class _Keyed:
+    """Rule input that hashes and compares by a frozen snapshot of its attributes."""
+    __slots__ = ('value', 'key')
+    
+    def __init__(self, value: Any):
+        self.value = value
+        self.key = _freeze(vars(value) if hasattr(value, '__dict__') else value)
+        hash(self.key)  # TypeError if some attribute can't be frozen
+    
+    def __hash__(self):
+        return hash(self.key)
+    
+    def __eq__(self, other):
+        return self.key == other.key
+
+
 class PolicyEngine:
     """
     Attribute-Based Access Control (ABAC) engine.
@@ -84,6 +124,13 @@ class PolicyEngine:
     def __init__(self):
         """Initialize policy engine with default rules."""
         self.rules: List[AccessRule] = []
+        # Rules paired with their compiled conditions, in evaluation order
+        self._compiled_rules: List[Tuple[AccessRule, CodeType]] = []
+        # Decisions keyed by (user attributes, document attributes, action);
+        # cleared whenever the rule set changes
+        self._cached_decide = functools.lru_cache(maxsize=4096)(
+            lambda user, document, action: self._decide(user.value, document.value, action)
+        )
         self._load_default_rules()
     
     def _load_default_rules(self):
@@ -148,6 +195,7 @@ class PolicyEngine:
         self.rules.append(rule)
         # Sort by priority (descending)
         self.rules.sort(key=lambda r: r.priority, reverse=True)
+        self._compile_rules()
     
     def remove_rule(self, rule_name: str):
         """
@@ -157,6 +205,70 @@ class PolicyEngine:
             rule_name: Name of rule to remove
         """
         self.rules = [r for r in self.rules if r.name != rule_name]
+        self._compile_rules()
+    
+    def _compile_rules(self):
+        """Compile rule conditions once instead of on every evaluation."""
+        self._compiled_rules = [
+            (rule, compile(rule.condition, f"<rule {rule.name}>", "eval"))
+            for rule in self.rules
+        ]
+        self._cached_decide.cache_clear()
+    
+    def _matching_rules(
+        self,
+        user: Any,
+        document: Dict[str, Any],
+        action: str,
+        warn: bool = True
+    ) -> Iterator[AccessRule]:
+        """Yield the rules whose condition holds, in priority order."""
+        context = {
+            'user': user,
+            'document': document,
+            'action': action,
+            # Helper functions
+            'contains': _contains,
+        }
+        
+        for rule, code in self._compiled_rules:
+            try:
+                # Evaluate rule condition
+                result = eval(code, {"__builtins__": {}}, context)
+            except Exception as e:
+                # Rule evaluation failed - skip
+                if warn:
+                    print(f"Warning: Rule '{rule.name}' evaluation failed: {e}")
+                continue
+            
+            if result:
+                yield rule
+    
+    def _decide(
+        self,
+        user: Any,
+        document: Dict[str, Any],
+        action: str
+    ) -> bool:
+        """Evaluate rules in priority order; the first match decides."""
+        for rule in self._matching_rules(user, document, action):
+            # Rule matched - return allow/deny
+            return rule.allow
+        
+        # Default deny if no rules matched
+        return False
+    
+    def _lookup(
+        self,
+        user: Any,
+        document: Dict[str, Any],
+        action: str
+    ) -> bool:
+        """Cached _decide; falls back to direct evaluation for unhashable inputs."""
+        try:
+            return self._cached_decide(_Keyed(user), _Keyed(document), action)
+        except TypeError:
+            return self._decide(user, document, action)
     
     def check_access(
         self,
@@ -175,31 +287,39 @@ class PolicyEngine:
         Returns:
             True if access allowed, False otherwise
         """
-        # Create evaluation context
-        context = {
-            'user': user,
-            'document': document,
-            'action': action,
-            # Helper functions
-            'contains': lambda lst, item: item in lst if isinstance(lst, list) else False,
-        }
+        return self._lookup(user, document, action)
+    
+    def check_access_many(
+        self,
+        user: Any,
+        documents: List[Dict[str, Any]],
+        action: str = "view"
+    ) -> List[bool]:
+        """
+        Check a user's access to several documents.
+        
+        Args:
+            user: User object with attributes
+            documents: Document attribute dictionaries
+            action: Action being performed
+            
+        Returns:
+            List of access decisions, one per document
+        """
+        try:
+            # Snapshot the user once for the whole batch
+            user_key = _Keyed(user)
+        except TypeError:
+            return [self._decide(user, document, action) for document in documents]
         
-        # Evaluate rules in priority order
-        for rule in self.rules:
+        decisions = []
+        for document in documents:
             try:
-                # Evaluate rule condition
-                result = eval(rule.condition, {"__builtins__": {}}, context)
-                
-                if result:
-                    # Rule matched - return allow/deny
-                    return rule.allow
-            except Exception as e:
-                # Rule evaluation failed - skip
-                print(f"Warning: Rule '{rule.name}' evaluation failed: {e}")
-                continue
+                decisions.append(self._cached_decide(user_key, _Keyed(document), action))
+            except TypeError:
+                decisions.append(self._decide(user, document, action))
         
-        # Default deny if no rules matched
-        return False
+        return decisions
     
     def explain_decision(
         self,
@@ -218,33 +338,21 @@ class PolicyEngine:
         Returns:
             Dictionary with decision and reasoning
         """
-        context = {
-            'user': user,
-            'document': document,
-            'action': action,
-            'contains': lambda lst, item: item in lst if isinstance(lst, list) else False,
-        }
-        
         matched_rules = []
         decision = False
         
-        for rule in self.rules:
-            try:
-                result = eval(rule.condition, {"__builtins__": {}}, context)
-                
-                if result:
-                    matched_rules.append({
-                        'name': rule.name,
-                        'description': rule.description,
-                        'condition': rule.condition,
-                        'priority': rule.priority,
-                        'allow': rule.allow
-                    })
-                    
-                    if decision is False:  # First match determines decision
-                        decision = rule.allow
-            except Exception as e:
-                continue
+        # Evaluated directly: the cache only keeps decisions, not every match
+        for rule in self._matching_rules(user, document, action, warn=False):
+            matched_rules.append({
+                'name': rule.name,
+                'description': rule.description,
+                'condition': rule.condition,
+                'priority': rule.priority,
+                'allow': rule.allow
+            })
+            
+            if decision is False:  # First match determines decision
+                decision = rule.allow
         
         return {
             'allowed': decision,
@@ -179,15 +179,20 @@ class DocumentClassifier:
         Returns:
             List of classification results
         """
-        results = []
+        results: List[Optional[Dict]] = [None] * len(texts)
         
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i:i + batch_size]
+        # Batch texts of similar length together so each batch is only
+        # padded to its own longest text
+        order = sorted(range(len(texts)), key=lambda idx: len(texts[idx]))
+        
+        for i in range(0, len(order), batch_size):
+            batch_indices = order[i:i + batch_size]
+            batch_texts = [texts[idx] for idx in batch_indices]
             
             # Tokenize batch
             inputs = self.tokenizer(
                 batch_texts,
-                padding='max_length',
+                padding='longest',
                 truncation=True,
                 max_length=512,
                 return_tensors='pt'
@@ -198,21 +203,21 @@ class DocumentClassifier:
             
             # Forward pass
             with torch.no_grad():
-                class_logits, _ = self.model(
+                outputs = self.model(
                     input_ids=inputs['input_ids'],
                     attention_mask=inputs['attention_mask']
                 )
             
             # Get probabilities
-            probs = torch.softmax(class_logits, dim=-1)
+            probs = torch.softmax(outputs['classification_logits'], dim=-1)
             
-            # Process each result
-            for j in range(len(batch_texts)):
+            # Process each result, back in input order
+            for j, idx in enumerate(batch_indices):
                 confidence, pred_idx = torch.max(probs[j], dim=0)
                 doc_type = self.model.DOC_TYPES[pred_idx.item()]
                 confidence = confidence.item()
                 
-                result = {
+                results[idx] = {
                     'doc_type': doc_type,
                     'confidence': confidence,
                     'needs_review': confidence < confidence_threshold,
@@ -221,21 +226,33 @@ class DocumentClassifier:
                         for k, dt in enumerate(self.model.DOC_TYPES)
                     }
                 }
-                results.append(result)
         
         return results
     
+    def _match_keywords(self, text_lower: str) -> Dict[str, List[str]]:
+        """Keywords of each document type found in lower-cased text."""
+        return {
+            doc_type: [kw for kw in keywords if kw in text_lower]
+            for doc_type, keywords in self.DOC_TYPE_DESCRIPTIONS.items()
+        }
+    
     def _classify_by_keywords(
         self,
         text: str,
         return_all_scores: bool = True,
-        confidence_threshold: float = 0.5
+        confidence_threshold: float = 0.5,
+        found: Optional[Dict[str, List[str]]] = None
     ) -> Dict:
         """
         Keyword-based classification (fallback when model not available).
         Fast and accurate for well-structured documents.
+        
+        Args:
+            found: Result of _match_keywords for this text, if already computed
         """
         text_lower = text.lower()
+        if found is None:
+            found = self._match_keywords(text_lower)
         scores = {}
         
         # Score each document type based on keyword matches
@@ -245,7 +262,7 @@ class DocumentClassifier:
                 continue
             
             # Count keyword matches
-            matches = sum(1 for kw in keywords if kw in text_lower)
+            matches = len(found[doc_type])
             
             # Calculate score with better scaling
             if matches == 0:
@@ -283,8 +300,7 @@ class DocumentClassifier:
             confidence = 0.70  # Medium confidence for other category
         
         # Find matching keywords for explanation
-        keywords = self.DOC_TYPE_DESCRIPTIONS.get(doc_type, [])
-        found_keywords = [kw for kw in keywords if kw in text_lower]
+        found_keywords = found.get(doc_type, [])
         
         result = {
             'type': doc_type,
@@ -309,7 +325,10 @@ class DocumentClassifier:
         Returns:
             Dictionary with classification and explanation
         """
-        result = self.classify(text, return_all_scores=True)
+        # Match keywords once; both the classification and the
+        # per-type explanations are built from the same matches
+        found = self._match_keywords(text.lower())
+        result = self._classify_by_keywords(text, return_all_scores=True, found=found)
         
         # Sort scores
         sorted_scores = sorted(
@@ -318,23 +337,18 @@ class DocumentClassifier:
             reverse=True
         )[:top_k]
         
-        # Find matching keywords for top predictions
-        text_lower = text.lower()
         explanations = []
         
         for doc_type, score in sorted_scores:
-            keywords = self.DOC_TYPE_DESCRIPTIONS.get(doc_type, [])
-            found_keywords = [kw for kw in keywords if kw.lower() in text_lower]
-            
             explanations.append({
                 'doc_type': doc_type,
                 'score': score,
                 'confidence': f"{score * 100:.2f}%",
-                'keywords_found': found_keywords[:5]  # Top 5 matching keywords
+                'keywords_found': found.get(doc_type, [])[:5]  # Top 5 matching keywords
             })
         
         return {
-            'prediction': result['doc_type'],
+            'prediction': result['type'],
             'confidence': result['confidence'],
             'needs_review': result['needs_review'],
             'explanations': explanations
@@ -13,6 +13,36 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _check_movement(from_zone: ZoneType, to_zone: ZoneType) -> Dict:
+    """Movement validation for one zone pair (see PaperControlSystem.validate_movement)."""
+    if from_zone.can_move_to(to_zone):
+        return {
+            'allowed': True,
+            'reason': f'Valid forward movement: {from_zone.get_icon()} {from_zone.value} → {to_zone.get_icon()} {to_zone.value}'
+        }
+    
+    # Check if it's a rescan scenario
+    if from_zone == ZoneType.QC and to_zone == ZoneType.SCANNING:
+        return {
+            'allowed': True,
+            'reason': 'QC rescan: Failed papers returning to scanning'
+        }
+    
+    return {
+        'allowed': False,
+        'reason': f'❌ BLOCKED: Cannot move backwards from {from_zone.value} to {to_zone.value}. Flow is unidirectional: Intake → Prep → Scanning → QC → Output'
+    }
+
+
+# Validation result for every zone pair, computed once; the result depends
+# only on the two zones
+_MOVEMENT_TABLE: Dict = {
+    (from_zone, to_zone): _check_movement(from_zone, to_zone)
+    for from_zone in ZoneType
+    for to_zone in ZoneType
+}
+
+
 class PaperControlSystem:
     """
     Central control system for managing paper movement
@@ -107,23 +137,11 @@ class PaperControlSystem:
         Returns:
             Validation result with allowed status and reason
         """
-        if from_zone.can_move_to(to_zone):
-            return {
-                'allowed': True,
-                'reason': f'Valid forward movement: {from_zone.get_icon()} {from_zone.value} → {to_zone.get_icon()} {to_zone.value}'
-            }
-        
-        # Check if it's a rescan scenario
-        if from_zone == ZoneType.QC and to_zone == ZoneType.SCANNING:
-            return {
-                'allowed': True,
-                'reason': 'QC rescan: Failed papers returning to scanning'
-            }
-        
-        return {
-            'allowed': False,
-            'reason': f'❌ BLOCKED: Cannot move backwards from {from_zone.value} to {to_zone.value}. Flow is unidirectional: Intake → Prep → Scanning → QC → Output'
-        }
+        result = _MOVEMENT_TABLE.get((from_zone, to_zone))
+        if result is None:
+            result = _check_movement(from_zone, to_zone)
+        # Copy, so callers cannot alter the shared table entry
+        return dict(result)
     
     def receive_box(self, box_id: str) -> Dict:
         """
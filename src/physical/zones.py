@@ -21,53 +21,19 @@ class ZoneType(Enum):
     
     def get_order(self) -> int:
         """Get the sequential order of this zone (lower = earlier in flow)"""
-        order_map = {
-            ZoneType.INTAKE: 1,
-            ZoneType.PREP: 2,
-            ZoneType.SCANNING: 3,
-            ZoneType.QC: 4,
-            ZoneType.OUTPUT: 5,
-            ZoneType.SORTING: 99,
-            ZoneType.PROCESSING: 99,
-            ZoneType.STORAGE: 99
-        }
-        return order_map.get(self, 999)
+        return self._order
     
     def get_icon(self) -> str:
         """Get visual icon for this zone"""
-        icons = {
-            ZoneType.INTAKE: "📥",
-            ZoneType.PREP: "🔧",
-            ZoneType.SCANNING: "📸",
-            ZoneType.QC: "✅",
-            ZoneType.OUTPUT: "📤",
-            ZoneType.SORTING: "📋",
-            ZoneType.PROCESSING: "⚙️",
-            ZoneType.STORAGE: "📦"
-        }
-        return icons.get(self, "❓")
+        return self._icon
     
     def get_next_zone(self) -> Optional['ZoneType']:
         """Get the next zone in the workflow (enforces left-to-right flow)"""
-        flow_map = {
-            ZoneType.INTAKE: ZoneType.PREP,
-            ZoneType.PREP: ZoneType.SCANNING,
-            ZoneType.SCANNING: ZoneType.QC,
-            ZoneType.QC: ZoneType.OUTPUT,
-            ZoneType.OUTPUT: None  # Terminal zone
-        }
-        return flow_map.get(self)
+        return self._next_zone
     
     def get_previous_zone(self) -> Optional['ZoneType']:
         """Get the previous zone (for rescan/return flows only)"""
-        flow_map = {
-            ZoneType.PREP: ZoneType.INTAKE,
-            ZoneType.SCANNING: ZoneType.PREP,
-            ZoneType.QC: ZoneType.SCANNING,
-            ZoneType.OUTPUT: ZoneType.QC,
-            ZoneType.INTAKE: None  # Starting zone
-        }
-        return flow_map.get(self)
+        return self._previous_zone
     
     def can_move_to(self, target_zone: 'ZoneType') -> bool:
         """Check if movement to target zone is allowed (forward only, or back to scanning for rescan)"""
@@ -81,6 +47,54 @@ class ZoneType(Enum):
         return False
 
 
+# Per-zone order, icon and flow neighbours, attached to each ZoneType member
+# once so the accessors above are plain attribute reads
+_ZONE_ORDER = {
+    ZoneType.INTAKE: 1,
+    ZoneType.PREP: 2,
+    ZoneType.SCANNING: 3,
+    ZoneType.QC: 4,
+    ZoneType.OUTPUT: 5,
+    ZoneType.SORTING: 99,
+    ZoneType.PROCESSING: 99,
+    ZoneType.STORAGE: 99
+}
+
+_ZONE_ICONS = {
+    ZoneType.INTAKE: "📥",
+    ZoneType.PREP: "🔧",
+    ZoneType.SCANNING: "📸",
+    ZoneType.QC: "✅",
+    ZoneType.OUTPUT: "📤",
+    ZoneType.SORTING: "📋",
+    ZoneType.PROCESSING: "⚙️",
+    ZoneType.STORAGE: "📦"
+}
+
+_NEXT_ZONE = {
+    ZoneType.INTAKE: ZoneType.PREP,
+    ZoneType.PREP: ZoneType.SCANNING,
+    ZoneType.SCANNING: ZoneType.QC,
+    ZoneType.QC: ZoneType.OUTPUT,
+    ZoneType.OUTPUT: None  # Terminal zone
+}
+
+_PREVIOUS_ZONE = {
+    ZoneType.PREP: ZoneType.INTAKE,
+    ZoneType.SCANNING: ZoneType.PREP,
+    ZoneType.QC: ZoneType.SCANNING,
+    ZoneType.OUTPUT: ZoneType.QC,
+    ZoneType.INTAKE: None  # Starting zone
+}
+
+for _zone in ZoneType:
+    _zone._order = _ZONE_ORDER.get(_zone, 999)
+    _zone._icon = _ZONE_ICONS.get(_zone, "❓")
+    _zone._next_zone = _NEXT_ZONE.get(_zone)
+    _zone._previous_zone = _PREVIOUS_ZONE.get(_zone)
+del _zone
+
+
 class PaperStatus(Enum):
     """Status of papers in the system"""
     RECEIVED = "received"
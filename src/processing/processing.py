@@ -27,7 +27,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Any, Protocol, runtime_checkable, Optional, Tuple
+from typing import List, Dict, Any, Protocol, runtime_checkable, Optional, Tuple, Set
+import mmap
 import re
 import json
 import time
@@ -140,11 +141,20 @@ class ProcessingPipeline:
 
     def run(self, artifacts: List[RawArtifact], ctx: ProcessingContext) -> List[StructuredArtifact]:
         structured: List[StructuredArtifact] = []
-        for artifact in artifacts:
-            current = artifact
-            for proc in self.processors:
-                current = proc.process(current, ctx)
-            structured.append(self.structurer.build_structured(current, ctx))
+        # Processors with optional begin_batch/end_batch hooks (e.g. routing's
+        # buffered audit log) get to set up and flush around the whole batch
+        batch_procs = [proc for proc in self.processors if hasattr(proc, "end_batch")]
+        for proc in batch_procs:
+            proc.begin_batch(ctx)
+        try:
+            for artifact in artifacts:
+                current = artifact
+                for proc in self.processors:
+                    current = proc.process(current, ctx)
+                structured.append(self.structurer.build_structured(current, ctx))
+        finally:
+            for proc in batch_procs:
+                proc.end_batch(ctx)
         return structured
 
 
@@ -474,14 +484,45 @@ class ClassificationProcessor:
     name = "classification"
     INVOICE_KW = {"invoice", "amount due", "total", "due date", "balance"}
     ID_KW = {"driver license", "passport", "id#", "date of birth", "dob"}
+    # All keywords in one pattern: the lookahead tests every offset, so
+    # overlapping keywords are still seen, and invoice wins ties at an offset
+    KEYWORD_RE = re.compile("(?=(?:(?P<invoice>{})|(?P<id>{})))".format(
+        "|".join(map(re.escape, sorted(INVOICE_KW))),
+        "|".join(map(re.escape, sorted(ID_KW))),
+    ))
+    # Same pattern over raw bytes for mmap'd OCR files (keywords are ASCII)
+    KEYWORD_RE_BYTES = re.compile(KEYWORD_RE.pattern.encode("ascii"), re.IGNORECASE)
+    # Below this size reading the file is cheaper than setting up a mapping
+    MMAP_MIN_SIZE = 4096
+
+    @staticmethod
+    def _scan_keywords(pattern: "re.Pattern", data: Any) -> Set[str]:
+        # Single scan; stop at the first invoice keyword since it takes priority
+        found: Set[str] = set()
+        for m in pattern.finditer(data):
+            found.add(m.lastgroup)
+            if m.lastgroup == "invoice":
+                break
+        return found
+
+    def _scan_ocr(self, path: Path) -> Set[str]:
+        """Return the keyword groups found in the OCR text file at ``path``.
+
+        Large files are scanned through a read-only mmap instead of being
+        decoded into a string first.
+        """
+        if path.stat().st_size < self.MMAP_MIN_SIZE:
+            return self._scan_keywords(self.KEYWORD_RE, path.read_text(encoding="utf-8").lower())
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return self._scan_keywords(self.KEYWORD_RE_BYTES, mm)
 
     def process(self, artifact: RawArtifact, ctx: ProcessingContext) -> RawArtifact:  # type: ignore[override]
         artifact.metadata.setdefault("processing", {})
         class_meta = artifact.metadata["processing"].setdefault("classification", {})
-        text = ""
+        found: Set[str] = set()
         if artifact.ocr_text_ref:
             try:
-                text = Path(artifact.ocr_text_ref).read_text(encoding="utf-8").lower()
+                found = self._scan_ocr(Path(artifact.ocr_text_ref))
             except Exception:
                 class_meta["status"] = "ocr_read_failed"
         layout = artifact.metadata.get("processing", {}).get("layout", {})
@@ -492,15 +533,14 @@ class ClassificationProcessor:
         text_blocks = sum(1 for t in types if t == "text_block")
         doc_type = "unknown"
         matches: List[str] = []
-        if text:
-            if any(kw in text for kw in self.INVOICE_KW):
-                doc_type = "invoice"
-                matches.append("invoice_kw")
-                if table_count >= 1:
-                    matches.append("table")
-            elif any(kw in text for kw in self.ID_KW):
-                doc_type = "id"
-                matches.append("id_kw")
+        if "invoice" in found:
+            doc_type = "invoice"
+            matches.append("invoice_kw")
+            if table_count >= 1:
+                matches.append("table")
+        elif "id" in found:
+            doc_type = "id"
+            matches.append("id_kw")
         if doc_type == "unknown" and table_count >= 2:
             doc_type = "form"
             matches.append("multi_table")
@@ -734,6 +774,8 @@ class RoutingProcessor:
         self._daily_rotation = daily_rotation
         self._enable_qc = enable_qc
         self._qc_queue = None
+        # Audit lines per log file while a pipeline batch is running
+        self._audit_buffer: Optional[Dict[Path, List[str]]] = None
         
         # Initialize QC queue if enabled
         if self._enable_qc:
@@ -847,8 +889,9 @@ class RoutingProcessor:
     def _emit_audit_log(self, artifact: RawArtifact, routing_meta: Dict[str, Any], ctx: ProcessingContext) -> None:  # type: ignore[no-untyped-def]
         """Write a JSONL record to audit log for downstream ML training and dashboard monitoring."""
         try:
+            now = datetime.utcnow()
             audit_entry = {
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": now.isoformat(),
                 "page_id": artifact.page_id,
                 "batch_id": ctx.batch_id,
                 "operator_id": ctx.operator_id,
@@ -863,13 +906,35 @@ class RoutingProcessor:
             # Apply daily rotation if enabled
             if self._daily_rotation:
                 base_path = Path(self._audit_log_base)
-                date_suffix = datetime.utcnow().strftime("%Y-%m-%d")
+                date_suffix = now.strftime("%Y-%m-%d")
                 log_path = base_path.with_name(f"{base_path.stem}_{date_suffix}{base_path.suffix}")
             else:
                 log_path = Path(self._audit_log_base)
+            line = json.dumps(audit_entry) + "\n"
+            if self._audit_buffer is not None:
+                self._audit_buffer.setdefault(log_path, []).append(line)
+            else:
+                self._write_audit_lines(log_path, [line])
+        except Exception:
+            # Non-fatal: do not block pipeline if audit log write fails
+            pass
+    
+    def begin_batch(self, ctx: ProcessingContext) -> None:
+        """Start buffering audit lines; ProcessingPipeline.run calls this before a batch."""
+        self._audit_buffer = {}
+    
+    def end_batch(self, ctx: ProcessingContext) -> None:
+        """Append the batch's buffered audit lines, opening each log file once."""
+        buffer, self._audit_buffer = self._audit_buffer, None
+        for log_path, lines in (buffer or {}).items():
+            self._write_audit_lines(log_path, lines)
+    
+    @staticmethod
+    def _write_audit_lines(log_path: Path, lines: List[str]) -> None:
+        try:
             log_path.parent.mkdir(parents=True, exist_ok=True)
-            with log_path.open("a", encoding="utf-8") as f:
-                f.write(json.dumps(audit_entry) + "\n")
+            with log_path.open("a", encoding="utf-8", buffering=1 << 16) as f:
+                f.writelines(lines)
         except Exception:
             # Non-fatal: do not block pipeline if audit log write fails
             pass
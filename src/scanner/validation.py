@@ -36,9 +36,6 @@ class FileValidator:
     def __init__(self):
         self._seen_hashes: Dict[str, int] = {}
 
-    def _compute_hash(self, data: bytes) -> str:
-        return hashlib.sha256(data).hexdigest()
-
     def _pdf_page_count(self, data: bytes) -> Optional[int]:
         if PyPDF2 is None:
             return None
@@ -52,15 +49,17 @@ class FileValidator:
     def validate(self, path: str) -> FileValidationResult:
         if not os.path.isfile(path):
             return FileValidationResult(path=path, sha256="", page_count=None, is_duplicate=False, error="not_found")
+        ext = os.path.splitext(path)[1].lower()
+        page_count = None
         try:
-            data = open(path, "rb").read()
+            # Stream the file through the digest; only PDFs need the bytes in memory
+            with open(path, "rb") as f:
+                sha256 = hashlib.file_digest(f, "sha256").hexdigest()
+                if ext == ".pdf":
+                    f.seek(0)
+                    page_count = self._pdf_page_count(f.read())
         except OSError as e:
             return FileValidationResult(path=path, sha256="", page_count=None, is_duplicate=False, error=str(e))
-        sha256 = self._compute_hash(data)
-        ext = os.path.splitext(path)[1].lower()
-        page_count = None
-        if ext == ".pdf":
-            page_count = self._pdf_page_count(data)
         prior = self._seen_hashes.get(sha256, 0)
         is_duplicate = prior > 0
         self._seen_hashes[sha256] = prior + 1
@@ -317,7 +317,8 @@ class IntegrationHookManager:
     def __init__(
         self,
         async_execution: bool = True,
-        max_queue_size: int = 1000
+        max_queue_size: int = 1000,
+        drop_when_full: bool = False
     ):
         """
         Initialize hook manager.
@@ -325,14 +326,18 @@ class IntegrationHookManager:
         Args:
             async_execution: Execute hooks asynchronously
             max_queue_size: Maximum queue size for async execution
+            drop_when_full: Drop events instead of blocking the caller when
+                the async queue is full (counted in events_dropped)
         """
         self.hooks: Dict[str, IntegrationHook] = {}
         self.async_execution = async_execution
+        self.drop_when_full = drop_when_full
         self.logger = logging.getLogger(__name__)
         
         # Statistics
         self.stats = {
             'events_fired': 0,
+            'events_dropped': 0,
             'hooks_executed': 0,
             'hooks_failed': 0,
             'total_execution_time': 0.0
@@ -397,7 +402,15 @@ class IntegrationHookManager:
         self.stats['events_fired'] += 1
         
         if self.async_execution:
-            self.event_queue.put(payload)
+            if not self.drop_when_full:
+                self.event_queue.put(payload)
+                return []
+            
+            try:
+                self.event_queue.put_nowait(payload)
+            except queue.Full:
+                self.stats['events_dropped'] += 1
+                self.logger.warning(f"Hook queue full, dropping event: {event.value}")
             return []
         else:
             return self._execute_hooks(payload)
@@ -438,12 +451,19 @@ class IntegrationHookManager:
     def _process_queue(self):
         """Worker thread for async hook execution."""
         while True:
+            payload = self.event_queue.get()
             try:
-                payload = self.event_queue.get()
                 self._execute_hooks(payload)
-                self.event_queue.task_done()
             except Exception as e:
                 self.logger.error(f"Error processing event queue: {e}")
+            finally:
+                # Always account for the event so flush() can return
+                self.event_queue.task_done()
+    
+    def flush(self):
+        """Block until all queued events have been processed."""
+        if self.async_execution:
+            self.event_queue.join()
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get hook execution statistics."""
@@ -466,6 +486,7 @@ class IntegrationHookManager:
         """Reset statistics."""
         self.stats = {
             'events_fired': 0,
+            'events_dropped': 0,
             'hooks_executed': 0,
             'hooks_failed': 0,
             'total_execution_time': 0.0
@@ -8,12 +8,14 @@ import json
 import shutil
 import hashlib
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, BinaryIO, Iterator
 import logging
 import uuid
 
 from .storage_interface import (
+    DEFAULT_CHUNK_SIZE,
     StorageInterface,
     StorageBackend,
     StorageMetadata,
@@ -149,6 +151,22 @@ class LocalStorageManager(StorageInterface):
         
         return version_id
     
+    def _create_version_from_file(self, key: str, source_path: Path) -> str:
+        """Create a new version of an object by copying a file."""
+        if not self.enable_versioning:
+            return "null"
+        
+        version_id = datetime.now().strftime("%Y%m%d%H%M%S%f")
+        version_dir = self._get_version_dir(key)
+        version_dir.mkdir(parents=True, exist_ok=True)
+        
+        shutil.copyfile(source_path, version_dir / version_id)
+        
+        # Clean up old versions
+        self._cleanup_old_versions(key)
+        
+        return version_id
+    
     def _cleanup_old_versions(self, key: str):
         """Remove old versions exceeding max_versions."""
         version_dir = self._get_version_dir(key)
@@ -202,24 +220,142 @@ class LocalStorageManager(StorageInterface):
         
         return storage_metadata
     
-    def get_object(
+    def put_object_stream(
         self,
         key: str,
-        version_id: Optional[str] = None
-    ) -> bytes:
-        """Retrieve an object from local filesystem."""
+        fileobj: BinaryIO,
+        content_type: str = "application/octet-stream",
+        metadata: Optional[Dict[str, str]] = None
+    ) -> StorageMetadata:
+        """Store an object from a file object without buffering it in memory."""
+        object_path = self._get_object_path(key)
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Create version before overwriting
+        if object_path.exists() and self.enable_versioning:
+            self._create_version_from_file(key, object_path)
+        
+        # Write new object chunk by chunk, hashing as we go
+        md5 = hashlib.md5()
+        size = 0
+        with open(object_path, 'wb') as f:
+            while True:
+                chunk = fileobj.read(DEFAULT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                md5.update(chunk)
+                size += len(chunk)
+                f.write(chunk)
+        
+        # Create metadata
+        storage_metadata = StorageMetadata(
+            key=key,
+            size=size,
+            content_type=content_type,
+            etag=md5.hexdigest(),
+            last_modified=datetime.now(),
+            version_id=self._create_version_from_file(key, object_path) if self.enable_versioning else None,
+            metadata=metadata,
+            storage_class="STANDARD"
+        )
+        
+        # Save metadata
+        self._save_metadata(storage_metadata)
+        
+        return storage_metadata
+    
+    def put_object_from_path(
+        self,
+        source_path: str,
+        key: str,
+        content_type: str = "application/octet-stream",
+        metadata: Optional[Dict[str, str]] = None
+    ) -> StorageMetadata:
+        """
+        Store an object by copying a local file.
+        
+        The copy is done with shutil.copyfile, which uses sendfile /
+        copy_file_range so the payload never passes through Python.
+        
+        Args:
+            source_path: Path of the file to store
+            key: Object key
+            content_type: MIME type
+            metadata: Custom metadata
+        
+        Returns:
+            StorageMetadata of the stored object
+        """
+        object_path = self._get_object_path(key)
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Create version before overwriting
+        if object_path.exists() and self.enable_versioning:
+            self._create_version_from_file(key, object_path)
+        
+        shutil.copyfile(source_path, object_path)
+        
+        with open(object_path, 'rb') as f:
+            etag = hashlib.file_digest(f, 'md5').hexdigest()
+        
+        # Create metadata
+        storage_metadata = StorageMetadata(
+            key=key,
+            size=object_path.stat().st_size,
+            content_type=content_type,
+            etag=etag,
+            last_modified=datetime.now(),
+            version_id=self._create_version_from_file(key, object_path) if self.enable_versioning else None,
+            metadata=metadata,
+            storage_class="STANDARD"
+        )
+        
+        # Save metadata
+        self._save_metadata(storage_metadata)
+        
+        return storage_metadata
+    
+    def _resolve_read_path(self, key: str, version_id: Optional[str] = None) -> Path:
+        """Get path of an existing object or version, raising if missing."""
         if version_id:
             # Get specific version
             version_path = self._get_version_dir(key) / version_id
             if not version_path.exists():
                 raise FileNotFoundError(f"Version not found: {key}@{version_id}")
-            return version_path.read_bytes()
-        else:
-            # Get current version
-            object_path = self._get_object_path(key)
-            if not object_path.exists():
-                raise FileNotFoundError(f"Object not found: {key}")
-            return object_path.read_bytes()
+            return version_path
+        
+        # Get current version
+        object_path = self._get_object_path(key)
+        if not object_path.exists():
+            raise FileNotFoundError(f"Object not found: {key}")
+        return object_path
+    
+    def get_object(
+        self,
+        key: str,
+        version_id: Optional[str] = None
+    ) -> bytes:
+        """Retrieve an object from local filesystem."""
+        return self._resolve_read_path(key, version_id).read_bytes()
+    
+    def get_object_stream(
+        self,
+        key: str,
+        version_id: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """Retrieve an object from local filesystem in chunks."""
+        path = self._resolve_read_path(key, version_id)
+        
+        def _iter_chunks():
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+        
+        return _iter_chunks()
     
     def delete_object(
         self,
@@ -262,8 +398,13 @@ class LocalStorageManager(StorageInterface):
         max_keys: int = 1000
     ) -> List[StorageMetadata]:
         """List objects in local storage."""
-        objects = []
-        
+        return list(islice(self.iter_objects(prefix=prefix), max_keys))
+    
+    def iter_objects(
+        self,
+        prefix: str = ""
+    ) -> Iterator[StorageMetadata]:
+        """Lazily iterate objects in local storage."""
         # Find all object files
         if prefix:
             pattern = f"{prefix}*"
@@ -276,12 +417,7 @@ class LocalStorageManager(StorageInterface):
                 metadata = self._load_metadata(key)
                 
                 if metadata:
-                    objects.append(metadata)
-                
-                if len(objects) >= max_keys:
-                    break
-        
-        return objects
+                    yield metadata
     
     def get_metadata(
         self,
@@ -5,8 +5,12 @@ PostgreSQL database for metadata indexing, audit logs, and storage records.
 Provides better scalability and concurrent access compared to SQLite.
 """
 
+import contextlib
+import csv
+import io
 import json
 import logging
+import weakref
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
@@ -20,6 +24,71 @@ except ImportError:
     POSTGRES_AVAILABLE = False
 
 
+# Server-side prepared statements for the hot write paths, keyed by name.
+# Prepared lazily once per pooled connection and reused via EXECUTE.
+_PREPARED_STATEMENTS = {
+    'puda_record_object': """
+        INSERT INTO storage_objects 
+            (object_key, size, content_type, etag, version_id, 
+             storage_backend, storage_class, metadata, last_modified)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, CURRENT_TIMESTAMP)
+        ON CONFLICT (object_key) DO UPDATE SET
+            size = EXCLUDED.size,
+            content_type = EXCLUDED.content_type,
+            etag = EXCLUDED.etag,
+            version_id = EXCLUDED.version_id,
+            storage_class = EXCLUDED.storage_class,
+            metadata = EXCLUDED.metadata,
+            last_modified = CURRENT_TIMESTAMP
+        RETURNING id
+    """,
+    'puda_clear_latest_version': """
+        UPDATE storage_versions 
+        SET is_latest = FALSE 
+        WHERE object_key = $1
+    """,
+    'puda_record_version': """
+        INSERT INTO storage_versions
+            (object_key, version_id, size, etag, last_modified, 
+             is_latest, created_by, comment, tags)
+        VALUES ($1, $2, $3, $4, CURRENT_TIMESTAMP, $5, $6, $7, $8)
+        ON CONFLICT (object_key, version_id) DO UPDATE SET
+            is_latest = EXCLUDED.is_latest,
+            comment = EXCLUDED.comment,
+            tags = EXCLUDED.tags
+    """,
+    'puda_log_audit': """
+        INSERT INTO storage_audit
+            (user_id, username, action, object_key, version_id,
+             ip_address, user_agent, success, error_message, metadata)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+    """,
+}
+
+
+def _escape_like(text: str) -> str:
+    """Escape LIKE/ILIKE metacharacters so text matches literally (ESCAPE '\\')."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+# Secondary indexes that bulk loads can drop and rebuild afterwards (name -> definition).
+# Indexes used by the load itself (object_key lookups/upserts) are kept.
+_BULK_LOAD_INDEXES = {
+    'idx_storage_objects_key_pattern': "storage_objects(object_key text_pattern_ops)",
+    'idx_storage_objects_backend': "storage_objects(storage_backend)",
+    'idx_storage_objects_modified': "storage_objects(last_modified DESC)",
+    'idx_storage_objects_metadata': "storage_objects USING gin(metadata)",
+    'idx_storage_objects_search': "storage_objects USING gin(search_vector)",
+    'idx_storage_objects_key_trgm': "storage_objects USING gin(object_key gin_trgm_ops)",
+    'idx_storage_versions_version': "storage_versions(version_id)",
+    'idx_storage_versions_tags': "storage_versions USING gin(tags)",
+    'idx_storage_audit_timestamp': "storage_audit(timestamp DESC)",
+    'idx_storage_audit_user': "storage_audit(user_id)",
+    'idx_storage_audit_key': "storage_audit(object_key)",
+    'idx_storage_audit_action': "storage_audit(action)",
+}
+
+
 class PostgreSQLStorageDB:
     """
     PostgreSQL database for storage metadata and audit logs.
@@ -81,8 +150,12 @@ class PostgreSQLStorageDB:
             password=password
         )
         
+        # Prepared statement names per live connection (dropped with the connection)
+        self._prepared = weakref.WeakKeyDictionary()
+        
         # Initialize schema
         self._initialize_schema()
+        self.trigram_enabled = self._initialize_trigram_index()
         
         self.logger.info(f"PostgreSQL storage initialized: {host}:{port}/{database}")
     
@@ -94,6 +167,16 @@ class PostgreSQLStorageDB:
         """Return connection to pool."""
         self.pool.putconn(conn)
     
+    def _execute_prepared(self, cur, name: str, params: Tuple):
+        """Execute a named statement, preparing it on this connection if needed."""
+        prepared = self._prepared.setdefault(cur.connection, set())
+        if name not in prepared:
+            cur.execute(f"PREPARE {name} AS {_PREPARED_STATEMENTS[name]}")
+            prepared.add(name)
+        
+        placeholders = ", ".join(["%s"] * len(params))
+        cur.execute(f"EXECUTE {name} ({placeholders})", params)
+    
     def _initialize_schema(self):
         """Create database schema if not exists."""
         conn = self._get_connection()
@@ -118,6 +201,8 @@ class PostgreSQLStorageDB:
                     
                     CREATE INDEX IF NOT EXISTS idx_storage_objects_key 
                         ON storage_objects(object_key);
+                    CREATE INDEX IF NOT EXISTS idx_storage_objects_key_pattern 
+                        ON storage_objects(object_key text_pattern_ops);
                     CREATE INDEX IF NOT EXISTS idx_storage_objects_backend 
                         ON storage_objects(storage_backend);
                     CREATE INDEX IF NOT EXISTS idx_storage_objects_modified 
@@ -235,6 +320,81 @@ class PostgreSQLStorageDB:
         finally:
             self._put_connection(conn)
     
+    def _initialize_trigram_index(self) -> bool:
+        """
+        Create a pg_trgm index on object_key for substring search.
+        
+        Runs separately from the main schema because the extension may be
+        unavailable or need elevated privileges.
+        
+        Returns:
+            True if the trigram index is available
+        """
+        conn = self._get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+                    
+                    CREATE INDEX IF NOT EXISTS idx_storage_objects_key_trgm 
+                        ON storage_objects USING gin(object_key gin_trgm_ops);
+                """)
+                conn.commit()
+                return True
+        except Exception as e:
+            conn.rollback()
+            self.logger.warning(f"pg_trgm unavailable, substring search will not be indexed: {e}")
+            return False
+        finally:
+            self._put_connection(conn)
+    
+    @contextlib.contextmanager
+    def deferred_indexes(self, maintenance_work_mem: str = "1GB"):
+        """
+        Drop secondary indexes for the duration of a bulk load.
+        
+        Indexes are rebuilt with CREATE INDEX CONCURRENTLY on exit (even if
+        the load fails), which is much faster than maintaining them row by
+        row. Queries run without those indexes while the block is active,
+        so only use this for initial seeding or offline imports.
+        
+        Args:
+            maintenance_work_mem: Session memory for the index rebuild
+        """
+        indexes = {
+            name: definition for name, definition in _BULK_LOAD_INDEXES.items()
+            if self.trigram_enabled or name != 'idx_storage_objects_key_trgm'
+        }
+        
+        conn = self._get_connection()
+        try:
+            with conn.cursor() as cur:
+                for name in indexes:
+                    cur.execute(f"DROP INDEX IF EXISTS {name}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            self._put_connection(conn)
+            raise
+        
+        self.logger.info(f"Dropped {len(indexes)} indexes for bulk load")
+        
+        try:
+            yield
+        finally:
+            # CONCURRENTLY cannot run inside a transaction block
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SET maintenance_work_mem = %s", (maintenance_work_mem,))
+                    for name, definition in indexes.items():
+                        cur.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+                    cur.execute("RESET maintenance_work_mem")
+                self.logger.info(f"Rebuilt {len(indexes)} indexes after bulk load")
+            finally:
+                conn.autocommit = False
+                self._put_connection(conn)
+    
     def record_object(
         self,
         object_key: str,
@@ -255,11 +415,89 @@ class PostgreSQLStorageDB:
         conn = self._get_connection()
         try:
             with conn.cursor() as cur:
+                self._execute_prepared(cur, 'puda_record_object', (
+                    object_key, size, content_type, etag, version_id,
+                    storage_backend, storage_class, json.dumps(metadata) if metadata else None
+                ))
+                
+                object_id = cur.fetchone()[0]
+                conn.commit()
+                return object_id
+        except Exception as e:
+            conn.rollback()
+            self.logger.error(f"Failed to record object: {e}")
+            raise
+        finally:
+            self._put_connection(conn)
+    
+    @staticmethod
+    def _copy_rows(cur, table: str, columns: List[str], rows: List[Tuple]):
+        """Bulk load rows into a table with COPY ... FROM STDIN (CSV)."""
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerows(rows)
+        buf.seek(0)
+        cur.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buf
+        )
+    
+    def record_uploads(self, uploads: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Record a batch of uploads (object, version and audit rows) in one transaction.
+        
+        Rows are bulk loaded with COPY and committed once, instead of the
+        per-row round-trips of record_object/record_version/log_audit.
+        
+        Args:
+            uploads: Dicts with object_key, size, content_type, etag, version_id,
+                storage_backend and optional storage_class, metadata, created_by,
+                comment, user_id, username, audit_metadata
+        
+        Returns:
+            Mapping of object_key to object ID
+        """
+        if not uploads:
+            return {}
+        
+        conn = self._get_connection()
+        try:
+            with conn.cursor() as cur:
+                # Audit/version rows are reproducible from storage; skip the WAL flush wait
+                cur.execute("SET LOCAL synchronous_commit = OFF")
+                
+                # Objects: COPY into staging table, then upsert
+                cur.execute("""
+                    CREATE TEMP TABLE upload_objects (
+                        seq INTEGER,
+                        object_key TEXT,
+                        size BIGINT,
+                        content_type TEXT,
+                        etag TEXT,
+                        version_id TEXT,
+                        storage_backend TEXT,
+                        storage_class TEXT,
+                        metadata JSONB
+                    ) ON COMMIT DROP
+                """)
+                self._copy_rows(
+                    cur, "upload_objects",
+                    ["seq", "object_key", "size", "content_type", "etag", "version_id",
+                     "storage_backend", "storage_class", "metadata"],
+                    [(seq, u["object_key"], u["size"], u["content_type"], u["etag"],
+                      u.get("version_id"), u["storage_backend"], u.get("storage_class"),
+                      json.dumps(u["metadata"]) if u.get("metadata") else None)
+                     for seq, u in enumerate(uploads)]
+                )
                 cur.execute("""
                     INSERT INTO storage_objects 
                         (object_key, size, content_type, etag, version_id, 
                          storage_backend, storage_class, metadata, last_modified)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+                    SELECT DISTINCT ON (object_key)
+                        object_key, size, content_type, etag, version_id,
+                        storage_backend, storage_class, metadata, CURRENT_TIMESTAMP
+                    FROM upload_objects
+                    ORDER BY object_key, seq DESC
                     ON CONFLICT (object_key) DO UPDATE SET
                         size = EXCLUDED.size,
                         content_type = EXCLUDED.content_type,
@@ -268,16 +506,65 @@ class PostgreSQLStorageDB:
                         storage_class = EXCLUDED.storage_class,
                         metadata = EXCLUDED.metadata,
                         last_modified = CURRENT_TIMESTAMP
-                    RETURNING id
-                """, (object_key, size, content_type, etag, version_id,
-                      storage_backend, storage_class, json.dumps(metadata) if metadata else None))
+                    RETURNING id, object_key
+                """)
+                object_ids = {key: object_id for object_id, key in cur.fetchall()}
+                
+                # Versions: new uploads become the latest version
+                cur.execute("""
+                    UPDATE storage_versions 
+                    SET is_latest = FALSE 
+                    WHERE object_key = ANY(%s)
+                """, (list(object_ids),))
+                cur.execute("""
+                    CREATE TEMP TABLE upload_versions (
+                        seq INTEGER,
+                        object_key TEXT,
+                        version_id TEXT,
+                        size BIGINT,
+                        etag TEXT,
+                        created_by TEXT,
+                        comment TEXT
+                    ) ON COMMIT DROP
+                """)
+                self._copy_rows(
+                    cur, "upload_versions",
+                    ["seq", "object_key", "version_id", "size", "etag", "created_by", "comment"],
+                    [(seq, u["object_key"], u.get("version_id"), u["size"], u["etag"],
+                      u.get("created_by"), u.get("comment"))
+                     for seq, u in enumerate(uploads)]
+                )
+                cur.execute("""
+                    INSERT INTO storage_versions
+                        (object_key, version_id, size, etag, last_modified, 
+                         is_latest, created_by, comment)
+                    SELECT DISTINCT ON (object_key, version_id)
+                        object_key, version_id, size, etag, CURRENT_TIMESTAMP,
+                        seq = MAX(seq) OVER (PARTITION BY object_key),
+                        created_by, comment
+                    FROM upload_versions
+                    ORDER BY object_key, version_id, seq DESC
+                    ON CONFLICT (object_key, version_id) DO UPDATE SET
+                        is_latest = EXCLUDED.is_latest,
+                        comment = EXCLUDED.comment
+                """)
+                
+                # Audit rows need no upsert; COPY straight into the table
+                self._copy_rows(
+                    cur, "storage_audit",
+                    ["user_id", "username", "action", "object_key", "version_id",
+                     "success", "metadata"],
+                    [(u.get("user_id"), u.get("username"), "UPLOAD", u["object_key"],
+                      u.get("version_id"), True,
+                      json.dumps(u["audit_metadata"]) if u.get("audit_metadata") else None)
+                     for u in uploads]
+                )
                 
-                object_id = cur.fetchone()[0]
                 conn.commit()
-                return object_id
+                return object_ids
         except Exception as e:
             conn.rollback()
-            self.logger.error(f"Failed to record object: {e}")
+            self.logger.error(f"Failed to record uploads: {e}")
             raise
         finally:
             self._put_connection(conn)
@@ -301,7 +588,8 @@ class PostgreSQLStorageDB:
         prefix: Optional[str] = None,
         storage_backend: Optional[str] = None,
         limit: int = 1000,
-        offset: int = 0
+        offset: int = 0,
+        metadata_filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """List objects with optional filters."""
         conn = self._get_connection()
@@ -318,6 +606,10 @@ class PostgreSQLStorageDB:
                     query += " AND storage_backend = %s"
                     params.append(storage_backend)
                 
+                if metadata_filters:
+                    query += " AND metadata @> %s::jsonb"
+                    params.append(json.dumps(metadata_filters))
+                
                 query += " ORDER BY last_modified DESC LIMIT %s OFFSET %s"
                 params.extend([limit, offset])
                 
@@ -329,9 +621,35 @@ class PostgreSQLStorageDB:
     def search_objects(
         self,
         search_query: str,
-        limit: int = 100
+        limit: int = 100,
+        metadata_filters: Optional[Dict[str, Any]] = None,
+        prefix: Optional[str] = None,
+        substring: bool = False
     ) -> List[Dict[str, Any]]:
-        """Full-text search on objects."""
+        """
+        Full-text search on objects.
+        
+        Matches against the trigger-maintained search_vector column, which is
+        covered by the idx_storage_objects_search GIN index. With substring=True,
+        a query that matches nothing falls back to a literal, case-insensitive
+        substring match on object_key (served by the pg_trgm index when
+        available); results from it have rank 0. metadata_filters is applied as a
+        jsonb containment (@>) test so it can use idx_storage_objects_metadata,
+        and prefix as a left-anchored LIKE served by
+        idx_storage_objects_key_pattern, so the planner can combine indexes
+        instead of ranking rows outside the prefix.
+        """
+        filter_clause = ""
+        filter_params = []
+        
+        if prefix:
+            filter_clause += " AND object_key LIKE %s"
+            filter_params.append(f"{prefix}%")
+        
+        if metadata_filters:
+            filter_clause += " AND metadata @> %s::jsonb"
+            filter_params.append(json.dumps(metadata_filters))
+        
         conn = self._get_connection()
         try:
             with conn.cursor(cursor_factory=extras.RealDictCursor) as cur:
@@ -339,12 +657,23 @@ class PostgreSQLStorageDB:
                     SELECT *, ts_rank(search_vector, query) AS rank
                     FROM storage_objects, 
                          to_tsquery('english', %s) query
-                    WHERE search_vector @@ query
+                    WHERE search_vector @@ query""" + filter_clause + """
                     ORDER BY rank DESC
                     LIMIT %s
-                """, (search_query, limit))
+                """, (search_query, *filter_params, limit))
+                rows = cur.fetchall()
                 
-                return [dict(row) for row in cur.fetchall()]
+                if not rows and substring:
+                    cur.execute("""
+                        SELECT *, 0.0 AS rank
+                        FROM storage_objects
+                        WHERE object_key ILIKE %s ESCAPE '\\'""" + filter_clause + """
+                        ORDER BY last_modified DESC
+                        LIMIT %s
+                    """, (f"%{_escape_like(search_query)}%", *filter_params, limit))
+                    rows = cur.fetchall()
+                
+                return [dict(row) for row in rows]
         finally:
             self._put_connection(conn)
     
@@ -381,24 +710,13 @@ class PostgreSQLStorageDB:
             with conn.cursor() as cur:
                 # Mark all versions as not latest if this is latest
                 if is_latest:
-                    cur.execute("""
-                        UPDATE storage_versions 
-                        SET is_latest = FALSE 
-                        WHERE object_key = %s
-                    """, (object_key,))
+                    self._execute_prepared(cur, 'puda_clear_latest_version', (object_key,))
                 
                 # Insert version
-                cur.execute("""
-                    INSERT INTO storage_versions
-                        (object_key, version_id, size, etag, last_modified, 
-                         is_latest, created_by, comment, tags)
-                    VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP, %s, %s, %s, %s)
-                    ON CONFLICT (object_key, version_id) DO UPDATE SET
-                        is_latest = EXCLUDED.is_latest,
-                        comment = EXCLUDED.comment,
-                        tags = EXCLUDED.tags
-                """, (object_key, version_id, size, etag, is_latest,
-                      created_by, comment, json.dumps(tags) if tags else None))
+                self._execute_prepared(cur, 'puda_record_version', (
+                    object_key, version_id, size, etag, is_latest,
+                    created_by, comment, json.dumps(tags) if tags else None
+                ))
                 
                 conn.commit()
         except Exception as e:
@@ -441,14 +759,11 @@ class PostgreSQLStorageDB:
         conn = self._get_connection()
         try:
             with conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO storage_audit
-                        (user_id, username, action, object_key, version_id,
-                         ip_address, user_agent, success, error_message, metadata)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (user_id, username, action, object_key, version_id,
-                      ip_address, user_agent, success, error_message,
-                      json.dumps(metadata) if metadata else None))
+                self._execute_prepared(cur, 'puda_log_audit', (
+                    user_id, username, action, object_key, version_id,
+                    ip_address, user_agent, success, error_message,
+                    json.dumps(metadata) if metadata else None
+                ))
                 
                 conn.commit()
         except Exception as e:
@@ -457,6 +772,50 @@ class PostgreSQLStorageDB:
         finally:
             self._put_connection(conn)
     
+    def log_audit_batch(self, entries: List[Dict[str, Any]]) -> int:
+        """
+        Log a batch of audit events with a single COPY.
+        
+        Args:
+            entries: Dicts with the log_audit arguments, plus an optional
+                timestamp (defaults to the time of the insert)
+        
+        Returns:
+            Number of events written
+        
+        Raises:
+            Exception: If the batch could not be written (nothing is committed)
+        """
+        if not entries:
+            return 0
+        
+        conn = self._get_connection()
+        try:
+            with conn.cursor() as cur:
+                # Audit rows can tolerate the small loss window on crash
+                cur.execute("SET LOCAL synchronous_commit = OFF")
+                self._copy_rows(
+                    cur, "storage_audit",
+                    ["timestamp", "user_id", "username", "action", "object_key",
+                     "version_id", "ip_address", "user_agent", "success",
+                     "error_message", "metadata"],
+                    [(e.get("timestamp") or datetime.now(), e.get("user_id"), e.get("username"),
+                      e["action"], e.get("object_key"), e.get("version_id"),
+                      e.get("ip_address"), e.get("user_agent"), e.get("success", True),
+                      e.get("error_message"),
+                      json.dumps(e["metadata"]) if e.get("metadata") else None)
+                     for e in entries]
+                )
+                
+                conn.commit()
+                return len(entries)
+        except Exception as e:
+            conn.rollback()
+            self.logger.error(f"Failed to log audit batch: {e}")
+            raise
+        finally:
+            self._put_connection(conn)
+    
     def get_audit_logs(
         self,
         object_key: Optional[str] = None,
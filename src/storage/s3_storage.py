@@ -5,10 +5,13 @@ Supports AWS S3, MinIO, Wasabi, Backblaze B2, and other S3-compatible services.
 """
 
 import hashlib
+import io
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Optional, Dict, Any, List, BinaryIO
+from typing import Optional, Dict, Any, List, BinaryIO, Iterator
 import logging
 
 try:
@@ -20,6 +23,7 @@ except ImportError:
     S3_AVAILABLE = False
 
 from .storage_interface import (
+    DEFAULT_CHUNK_SIZE,
     StorageInterface,
     StorageBackend,
     StorageMetadata,
@@ -27,6 +31,40 @@ from .storage_interface import (
 )
 
 
+class _MemoryViewReader(io.RawIOBase):
+    """Seekable read-only file over a memoryview, so upload parts are read
+    straight from the caller's buffer instead of being copied up front."""
+    
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._pos = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        size = max(0, min(len(buffer), len(self._view) - self._pos))
+        buffer[:size] = self._view[self._pos:self._pos + size]
+        self._pos += size
+        return size
+    
+    def readall(self) -> bytes:
+        data = self._view[self._pos:].tobytes()
+        self._pos = len(self._view)
+        return data
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+    
+    def tell(self) -> int:
+        return self._pos
+
+
 class S3StorageManager(StorageInterface):
     """
     S3-compatible storage manager.
@@ -59,7 +97,10 @@ class S3StorageManager(StorageInterface):
         aws_secret_access_key: Optional[str] = None,
         enable_versioning: bool = True,
         storage_class: str = "STANDARD",
-        encryption: str = "AES256"
+        encryption: str = "AES256",
+        multipart_threshold: int = 8 * 1024 * 1024,
+        multipart_chunksize: int = 8 * 1024 * 1024,
+        max_concurrency: int = 10
     ):
         """
         Initialize S3 storage manager.
@@ -73,6 +114,9 @@ class S3StorageManager(StorageInterface):
             enable_versioning: Enable bucket versioning
             storage_class: Default storage class
             encryption: Server-side encryption (AES256 or aws:kms)
+            multipart_threshold: put_object payloads above this size use multipart upload
+            multipart_chunksize: Part size for multipart uploads (min 5 MiB)
+            max_concurrency: Parallel part uploads per multipart upload
         """
         if not S3_AVAILABLE:
             raise ImportError("boto3 not installed. Install via: pip install boto3")
@@ -82,13 +126,18 @@ class S3StorageManager(StorageInterface):
         self.endpoint_url = endpoint_url
         self.storage_class = storage_class
         self.encryption = encryption
+        self.multipart_threshold = multipart_threshold
+        self.multipart_chunksize = max(multipart_chunksize, 5 * 1024 * 1024)
+        self.max_concurrency = max_concurrency
         self.logger = logging.getLogger(__name__)
         
-        # Configure boto3 client
+        # Configure boto3 client (pool sized for concurrent part uploads;
+        # the client itself is thread-safe)
         config = Config(
             region_name=region,
             signature_version='s3v4',
-            retries={'max_attempts': 3, 'mode': 'standard'}
+            retries={'max_attempts': 3, 'mode': 'standard'},
+            max_pool_connections=max(10, max_concurrency)
         )
         
         # Create S3 client
@@ -150,6 +199,9 @@ class S3StorageManager(StorageInterface):
         metadata: Optional[Dict[str, str]] = None
     ) -> StorageMetadata:
         """Store an object in S3."""
+        if len(data) > self.multipart_threshold:
+            return self._put_object_multipart(key, data, content_type, metadata)
+        
         try:
             # Prepare put_object parameters
             put_params = {
@@ -205,6 +257,129 @@ class S3StorageManager(StorageInterface):
             self.logger.error(f"Failed to get object {key}: {e}")
             raise
     
+    def _put_object_multipart(
+        self,
+        key: str,
+        data: bytes,
+        content_type: str,
+        metadata: Optional[Dict[str, str]]
+    ) -> StorageMetadata:
+        """Upload a large in-memory object as parallel multipart parts."""
+        create_params = {
+            'Bucket': self.bucket_name,
+            'Key': key,
+            'ContentType': content_type,
+            'StorageClass': self.storage_class,
+            'ServerSideEncryption': self.encryption
+        }
+        if metadata:
+            create_params['Metadata'] = metadata
+        
+        upload_id = self.s3_client.create_multipart_upload(**create_params)['UploadId']
+        view = memoryview(data)
+        
+        def upload_part(part_number: int, start: int) -> Dict[str, Any]:
+            response = self.s3_client.upload_part(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=_MemoryViewReader(view[start:start + self.multipart_chunksize])
+            )
+            return {'PartNumber': part_number, 'ETag': response['ETag']}
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                futures = [
+                    executor.submit(upload_part, part_number, start)
+                    for part_number, start in enumerate(
+                        range(0, len(data), self.multipart_chunksize), start=1
+                    )
+                ]
+                parts = [future.result() for future in as_completed(futures)]
+            
+            parts.sort(key=lambda part: part['PartNumber'])
+            response = self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        except Exception as e:
+            self.logger.error(f"Multipart upload failed for {key}: {e}")
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id
+            )
+            raise
+        
+        return StorageMetadata(
+            key=key,
+            size=len(data),
+            content_type=content_type,
+            etag=response['ETag'].strip('"'),
+            last_modified=datetime.now(),
+            version_id=response.get('VersionId'),
+            metadata=metadata,
+            storage_class=self.storage_class
+        )
+    
+    def put_object_stream(
+        self,
+        key: str,
+        fileobj: BinaryIO,
+        content_type: str = "application/octet-stream",
+        metadata: Optional[Dict[str, str]] = None
+    ) -> StorageMetadata:
+        """Stream an object to S3 (multipart for large payloads)."""
+        try:
+            extra_args = {
+                'ContentType': content_type,
+                'StorageClass': self.storage_class,
+                'ServerSideEncryption': self.encryption
+            }
+            
+            if metadata:
+                extra_args['Metadata'] = metadata
+            
+            self.s3_client.upload_fileobj(
+                fileobj,
+                self.bucket_name,
+                key,
+                ExtraArgs=extra_args
+            )
+            
+            # Get metadata
+            return self.get_metadata(key)
+        except ClientError as e:
+            self.logger.error(f"Failed to put object {key}: {e}")
+            raise
+    
+    def get_object_stream(
+        self,
+        key: str,
+        version_id: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """Retrieve an object from S3 as a stream of chunks."""
+        try:
+            get_params = {
+                'Bucket': self.bucket_name,
+                'Key': key
+            }
+            
+            if version_id:
+                get_params['VersionId'] = version_id
+            
+            response = self.s3_client.get_object(**get_params)
+            return response['Body'].iter_chunks(chunk_size=chunk_size)
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchKey':
+                raise FileNotFoundError(f"Object not found: {key}")
+            self.logger.error(f"Failed to get object {key}: {e}")
+            raise
+    
     def delete_object(
         self,
         key: str,
@@ -232,18 +407,23 @@ class S3StorageManager(StorageInterface):
         max_keys: int = 1000
     ) -> List[StorageMetadata]:
         """List objects in S3 bucket."""
+        return list(islice(self.iter_objects(prefix=prefix), max_keys))
+    
+    def iter_objects(
+        self,
+        prefix: str = ""
+    ) -> Iterator[StorageMetadata]:
+        """Lazily page through objects in S3 bucket."""
         try:
             paginator = self.s3_client.get_paginator('list_objects_v2')
             pages = paginator.paginate(
                 Bucket=self.bucket_name,
-                Prefix=prefix,
-                PaginationConfig={'MaxItems': max_keys}
+                Prefix=prefix
             )
             
-            objects = []
             for page in pages:
                 for obj in page.get('Contents', []):
-                    objects.append(StorageMetadata(
+                    yield StorageMetadata(
                         key=obj['Key'],
                         size=obj['Size'],
                         content_type='',  # Not available in list
@@ -252,9 +432,7 @@ class S3StorageManager(StorageInterface):
                         version_id=None,  # Use list_object_versions for versions
                         metadata=None,
                         storage_class=obj.get('StorageClass', 'STANDARD')
-                    ))
-            
-            return objects
+                    )
         except ClientError as e:
             self.logger.error(f"Failed to list objects: {e}")
             raise
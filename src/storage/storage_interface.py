@@ -8,10 +8,14 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Dict, Any, List, BinaryIO
+from typing import Optional, Dict, Any, List, BinaryIO, Iterator
 from pathlib import Path
 
 
+# Chunk size used by streaming reads/writes (8 MiB)
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+
 class StorageBackend(Enum):
     """Supported storage backend types."""
     LOCAL = "local"
@@ -95,6 +99,54 @@ class StorageInterface(ABC):
         """
         pass
     
+    def put_object_stream(
+        self,
+        key: str,
+        fileobj: BinaryIO,
+        content_type: str = "application/octet-stream",
+        metadata: Optional[Dict[str, str]] = None
+    ) -> StorageMetadata:
+        """
+        Store an object from a binary file-like object.
+        
+        Backends override this to avoid buffering the whole object
+        in memory; the default implementation reads it fully.
+        
+        Args:
+            key: Object key/path
+            fileobj: Readable binary file object
+            content_type: MIME type
+            metadata: Custom metadata
+            
+        Returns:
+            StorageMetadata with version information
+        """
+        return self.put_object(key, fileobj.read(), content_type, metadata)
+    
+    def get_object_stream(
+        self,
+        key: str,
+        version_id: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """
+        Retrieve an object as an iterator of byte chunks.
+        
+        Args:
+            key: Object key/path
+            version_id: Specific version (None = latest)
+            chunk_size: Maximum size of each chunk
+            
+        Yields:
+            Object data chunks
+            
+        Raises:
+            FileNotFoundError: Object not found
+        """
+        data = self.get_object(key, version_id=version_id)
+        for offset in range(0, len(data), chunk_size):
+            yield data[offset:offset + chunk_size]
+    
     @abstractmethod
     def delete_object(
         self,
@@ -131,6 +183,24 @@ class StorageInterface(ABC):
         """
         pass
     
+    def iter_objects(
+        self,
+        prefix: str = ""
+    ) -> Iterator[StorageMetadata]:
+        """
+        Lazily iterate objects with optional prefix filter.
+        
+        Backends override this to page through results without
+        materializing the full listing.
+        
+        Args:
+            prefix: Key prefix filter
+            
+        Yields:
+            StorageMetadata per object
+        """
+        yield from self.list_objects(prefix=prefix)
+    
     @abstractmethod
     def get_metadata(
         self,
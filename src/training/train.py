@@ -37,6 +37,7 @@ Data format:
 import argparse
 import json
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Tuple, Optional
 import sys
@@ -48,6 +49,12 @@ from torch.optim import AdamW
 from transformers import get_linear_schedule_with_warmup
 from tqdm import tqdm
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from src.ml.models.puda_model import PudaModel, load_tokenizer
 
 logging.basicConfig(
@@ -75,6 +82,20 @@ class DocumentDataset(Dataset):
         # NER tag mapping (BIO format)
         self.ner_tag_map = {tag: idx for idx, tag in enumerate(PudaModel.NER_TAGS)}
         self.doc_type_map = {dtype: idx for idx, dtype in enumerate(PudaModel.DOC_TYPES)}
+        self.outside_id = self.ner_tag_map["O"]
+        
+        # Precompute (B, I) tag ids per entity label so labelling avoids
+        # per-token string formatting and dict lookups
+        entity_labels = {
+            entity["label"]
+            for item in data
+            for entity in item.get("entities", [])
+        }
+        self.label_to_bi = {label: self._bi_ids(label) for label in entity_labels}
+    
+    def _bi_ids(self, label: str) -> Tuple[Optional[int], Optional[int]]:
+        """Get (B, I) tag ids for an entity label (None if tag is unknown)."""
+        return self.ner_tag_map.get(f"B-{label}"), self.ner_tag_map.get(f"I-{label}")
     
     def __len__(self):
         return len(self.data)
@@ -122,12 +143,13 @@ class DocumentDataset(Dataset):
         seq_length: int
     ) -> List[int]:
         """Create BIO tags for tokens."""
-        labels = [self.ner_tag_map["O"]] * seq_length
+        labels = [self.outside_id] * seq_length
         
         for entity in entities:
             start_char = entity["start"]
             end_char = entity["end"]
             label = entity["label"]
+            b_id, i_id = self.label_to_bi.get(label) or self._bi_ids(label)
             
             # Find tokens that overlap with entity
             entity_tokens = []
@@ -139,25 +161,72 @@ class DocumentDataset(Dataset):
                 if token_start < end_char and token_end > start_char:
                     entity_tokens.append(token_idx)
             
+            if not entity_tokens:
+                continue
+            
             # Apply BIO tags
-            for i, token_idx in enumerate(entity_tokens):
-                prefix = "B" if i == 0 else "I"
-                tag = f"{prefix}-{label}"
-                if tag in self.ner_tag_map:
-                    labels[token_idx] = self.ner_tag_map[tag]
+            if b_id is not None:
+                labels[entity_tokens[0]] = b_id
+            if i_id is not None:
+                for token_idx in entity_tokens[1:]:
+                    labels[token_idx] = i_id
         
         return labels
 
 
 def load_data(data_path: str) -> List[Dict[str, Any]]:
     """Load training data from JSON file."""
-    with open(data_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    if ORJSON_AVAILABLE:
+        data = orjson.loads(Path(data_path).read_bytes())
+    else:
+        with open(data_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
     
     logger.info(f"Loaded {len(data)} examples from {data_path}")
     return data
 
 
+def freeze_lower_layers(model: PudaModel, num_layers: int) -> None:
+    """Freeze the embeddings and the first ``num_layers`` transformer blocks."""
+    transformer = model.transformer
+    for param in transformer.embeddings.parameters():
+        param.requires_grad_(False)
+    
+    layers = transformer.transformer.layer
+    for layer in layers[:num_layers]:
+        for param in layer.parameters():
+            param.requires_grad_(False)
+    
+    logger.info(f"Froze embeddings and {min(num_layers, len(layers))}/{len(layers)} transformer layers")
+
+
+def save_checkpoint_async(
+    executor: ThreadPoolExecutor,
+    model: PudaModel,
+    output_path: Path,
+    pending: Optional[Future] = None,
+    **extra: Any
+) -> Future:
+    """
+    Snapshot model weights to CPU and write the checkpoint on a background thread.
+    
+    The checkpoint layout matches what the classifier/inference loaders expect
+    (``model_state_dict`` + ``config`` + extras). Any previous pending save is
+    awaited first so two writes never race on the same file.
+    """
+    if pending is not None:
+        pending.result()
+    
+    state_dict = {k: v.detach().to("cpu", copy=True) for k, v in model.state_dict().items()}
+    checkpoint = {
+        "model_state_dict": state_dict,
+        "config": model.get_config(),
+        **extra
+    }
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    return executor.submit(torch.save, checkpoint, output_path)
+
+
 def train_epoch(
     model: PudaModel,
     dataloader: DataLoader,
@@ -166,7 +235,8 @@ def train_epoch(
     device: torch.device,
     task: str = "both",
     class_weight: float = 1.0,
-    ner_weight: float = 1.0
+    ner_weight: float = 1.0,
+    log_interval: int = 10
 ) -> Dict[str, float]:
     """Train for one epoch."""
     model.train()
@@ -178,9 +248,9 @@ def train_epoch(
     class_criterion = nn.CrossEntropyLoss()
     ner_criterion = nn.CrossEntropyLoss(ignore_index=-100)
     
-    progress = tqdm(dataloader, desc="Training")
+    progress = tqdm(dataloader, desc="Training", mininterval=0.5)
     
-    for batch in progress:
+    for step_idx, batch in enumerate(progress):
         input_ids = batch["input_ids"].to(device)
         attention_mask = batch["attention_mask"].to(device)
         class_labels = batch["class_label"].to(device)
@@ -213,13 +283,15 @@ def train_epoch(
         optimizer.step()
         scheduler.step()
         
-        total_loss += loss.item()
+        loss_value = loss.item()
+        total_loss += loss_value
         
-        # Update progress bar
-        progress.set_postfix({
-            "loss": f"{loss.item():.4f}",
-            "lr": f"{scheduler.get_last_lr()[0]:.2e}"
-        })
+        # Update progress bar (throttled)
+        if step_idx % log_interval == 0:
+            progress.set_postfix({
+                "loss": f"{loss_value:.4f}",
+                "lr": f"{scheduler.get_last_lr()[0]:.2e}"
+            })
     
     num_batches = len(dataloader)
     return {
@@ -238,12 +310,13 @@ def evaluate(
     """Evaluate model."""
     model.eval()
     
-    class_correct = 0
+    # Accumulate on device; sync with host once after the loop
+    class_correct_t = torch.zeros((), device=device, dtype=torch.long)
+    ner_correct_t = torch.zeros((), device=device, dtype=torch.long)
+    ner_total_t = torch.zeros((), device=device, dtype=torch.long)
     class_total = 0
-    ner_correct = 0
-    ner_total = 0
     
-    with torch.no_grad():
+    with torch.inference_mode():
         for batch in tqdm(dataloader, desc="Evaluating"):
             input_ids = batch["input_ids"].to(device)
             attention_mask = batch["attention_mask"].to(device)
@@ -255,15 +328,19 @@ def evaluate(
             # Classification accuracy
             if task in ["classify", "both"]:
                 class_preds = outputs["classification_logits"].argmax(dim=-1)
-                class_correct += (class_preds == class_labels).sum().item()
+                class_correct_t += (class_preds == class_labels).sum()
                 class_total += class_labels.size(0)
             
             # NER accuracy (token-level)
             if task in ["extract", "both"]:
                 ner_preds = outputs["extraction_logits"].argmax(dim=-1)
                 mask = (ner_labels != -100) & (attention_mask == 1)
-                ner_correct += ((ner_preds == ner_labels) & mask).sum().item()
-                ner_total += mask.sum().item()
+                ner_correct_t += ((ner_preds == ner_labels) & mask).sum()
+                ner_total_t += mask.sum()
+    
+    class_correct = class_correct_t.item()
+    ner_correct = ner_correct_t.item()
+    ner_total = ner_total_t.item()
     
     results = {}
     if task in ["classify", "both"]:
@@ -288,14 +365,28 @@ def main():
     parser.add_argument("--max-length", type=int, default=512, help="Max sequence length")
     parser.add_argument("--warmup-steps", type=int, default=100, help="Warmup steps")
     parser.add_argument("--use-bilstm", action="store_true", help="Use BiLSTM layer")
+    parser.add_argument("--grad-checkpoint", action="store_true", help="Recompute transformer activations in backward pass to save memory")
+    parser.add_argument("--freeze-layers", type=int, default=0, help="Freeze embeddings and the first N transformer layers")
     parser.add_argument("--device", type=str, default="cpu", help="Device (cpu or cuda)")
+    parser.add_argument("--log-interval", type=int, default=10, help="Update progress bar metrics every N steps")
+    parser.add_argument("--no-tf32", action="store_true", help="Disable TF32 matmuls on Ampere+ GPUs (enabled by default on CUDA; slightly changes FP32 numerics)")
     
     args = parser.parse_args()
+    if args.log_interval < 1:
+        parser.error("--log-interval must be at least 1")
     
     # Setup
     device = torch.device(args.device if torch.cuda.is_available() else "cpu")
     logger.info(f"Using device: {device}")
     
+    if device.type == "cuda" and not args.no_tf32:
+        # Let FP32 matmuls/convolutions use TF32 tensor cores
+        torch.set_float32_matmul_precision("high")
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        torch.backends.cudnn.benchmark = True
+        logger.info("Enabled TF32 matmul precision")
+    
     # Load data
     train_data = load_data(args.data)
     
@@ -308,6 +399,14 @@ def main():
         dropout=0.1,
         freeze_backbone=False
     )
+    if args.freeze_layers > 0:
+        freeze_lower_layers(model, args.freeze_layers)
+    if args.grad_checkpoint:
+        # No-op under no_grad, so evaluation is unaffected
+        model.transformer.gradient_checkpointing_enable(
+            gradient_checkpointing_kwargs={"use_reentrant": False}
+        )
+        logger.info("Enabled gradient checkpointing on transformer backbone")
     model = model.to(device)
     logger.info(f"Model parameters: {model.count_parameters():,}")
     
@@ -322,7 +421,7 @@ def main():
         val_loader = DataLoader(val_dataset, batch_size=args.batch_size)
     
     # Setup optimizer and scheduler
-    optimizer = AdamW(model.parameters(), lr=args.lr)
+    optimizer = AdamW((p for p in model.parameters() if p.requires_grad), lr=args.lr)
     total_steps = len(train_loader) * args.epochs
     scheduler = get_linear_schedule_with_warmup(
         optimizer,
@@ -333,6 +432,9 @@ def main():
     # Training loop
     logger.info(f"Training for {args.epochs} epochs...")
     best_val_metric = 0
+    output_path = Path(args.output)
+    save_executor = ThreadPoolExecutor(max_workers=1)
+    pending_save = None
     
     for epoch in range(args.epochs):
         logger.info(f"\nEpoch {epoch + 1}/{args.epochs}")
@@ -340,7 +442,7 @@ def main():
         # Train
         train_metrics = train_epoch(
             model, train_loader, optimizer, scheduler, device,
-            args.task, args.class_weight, args.ner_weight
+            args.task, args.class_weight, args.ner_weight, args.log_interval
         )
         
         logger.info(f"Train loss: {train_metrics['total_loss']:.4f}")
@@ -360,26 +462,24 @@ def main():
             val_metric = val_metrics.get("class_accuracy", 0) + val_metrics.get("ner_accuracy", 0)
             if val_metric > best_val_metric:
                 best_val_metric = val_metric
-                output_path = Path(args.output)
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                torch.save({
-                    "model_state_dict": model.state_dict(),
-                    "config": model.get_config(),
-                    "epoch": epoch,
-                    "metrics": val_metrics
-                }, output_path)
-                logger.info(f"✓ Saved best model to {output_path}")
+                pending_save = save_checkpoint_async(
+                    save_executor, model, output_path, pending_save,
+                    epoch=epoch, metrics=val_metrics
+                )
+                logger.info(f"✓ Saving best model to {output_path}")
     
     # Save final model
     if not val_loader:
-        output_path = Path(args.output)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        torch.save({
-            "model_state_dict": model.state_dict(),
-            "config": model.get_config(),
-            "epoch": args.epochs
-        }, output_path)
-        logger.info(f"✓ Saved final model to {output_path}")
+        pending_save = save_checkpoint_async(
+            save_executor, model, output_path, pending_save,
+            epoch=args.epochs
+        )
+        logger.info(f"✓ Saving final model to {output_path}")
+    
+    # Wait for outstanding checkpoint writes
+    if pending_save is not None:
+        pending_save.result()
+    save_executor.shutdown()
     
     logger.info("\n✅ Training complete!")
 
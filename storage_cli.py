@@ -10,6 +10,12 @@ from pathlib import Path
 from datetime import datetime
 import json
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
@@ -24,6 +30,30 @@ from src.storage import (
 )
 
 
+def _load_hook_config(config_file: Path) -> dict:
+    """Load integration hook config (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(config_file.read_bytes())
+    with open(config_file, 'r') as f:
+        return json.load(f)
+
+
+def _save_hook_config(config_file: Path, config: dict):
+    """Save integration hook config (orjson when available)."""
+    config_file.parent.mkdir(parents=True, exist_ok=True)
+    if ORJSON_AVAILABLE:
+        config_file.write_bytes(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+        return
+    with open(config_file, 'w') as f:
+        json.dump(config, f, indent=2)
+
+
+def _format_timestamp(dt: datetime) -> str:
+    """Format a timestamp as 'YYYY-MM-DD HH:MM:SS' (no locale-aware strftime)."""
+    # Slice drops any UTC offset suffix on tz-aware S3 timestamps
+    return dt.isoformat(sep=' ', timespec='seconds')[:19]
+
+
 def cmd_storage_info(args):
     """Display storage backend information."""
     storage = _create_storage(args)
@@ -39,12 +69,6 @@ def cmd_put(args):
     """Upload object to storage."""
     storage = _create_storage(args)
     
-    # Read file or stdin
-    if args.file:
-        data = Path(args.file).read_bytes()
-    else:
-        data = sys.stdin.buffer.read()
-    
     # Parse metadata
     metadata = {}
     if args.metadata:
@@ -52,13 +76,22 @@ def cmd_put(args):
             key, value = item.split('=', 1)
             metadata[key] = value
     
-    # Upload
-    result = storage.put_object(
-        args.key,
-        data,
-        content_type=args.content_type,
-        metadata=metadata if metadata else None
-    )
+    # Upload (streamed from file or stdin)
+    if args.file:
+        with open(args.file, 'rb') as f:
+            result = storage.put_object_stream(
+                args.key,
+                f,
+                content_type=args.content_type,
+                metadata=metadata if metadata else None
+            )
+    else:
+        result = storage.put_object_stream(
+            args.key,
+            sys.stdin.buffer,
+            content_type=args.content_type,
+            metadata=metadata if metadata else None
+        )
     
     print(f"[OK] Uploaded: {args.key}")
     print(f"  Size: {result.size} bytes")
@@ -70,13 +103,16 @@ def cmd_get(args):
     """Download object from storage."""
     storage = _create_storage(args)
     
-    data = storage.get_object(args.key, version_id=args.version)
+    chunks = storage.get_object_stream(args.key, version_id=args.version)
     
     if args.output:
-        Path(args.output).write_bytes(data)
+        with open(args.output, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
         print(f"[OK] Downloaded to: {args.output}")
     else:
-        sys.stdout.buffer.write(data)
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
 
 
 def cmd_delete(args):
@@ -96,16 +132,19 @@ def cmd_list(args):
     """List objects in storage."""
     storage = _create_storage(args)
     
-    objects = storage.list_objects(prefix=args.prefix, max_keys=args.limit)
-    
     print(f"\n=== Objects (prefix: {args.prefix or 'all'}) ===")
     print(f"{'Key':<50} {'Size':>10} {'Last Modified':<20}")
     print("-" * 82)
     
-    for obj in objects:
-        print(f"{obj.key:<50} {obj.size:>10} {obj.last_modified.strftime('%Y-%m-%d %H:%M:%S')}")
+    # Stream rows as pages arrive instead of materializing the listing
+    count = 0
+    for obj in storage.iter_objects(prefix=args.prefix):
+        if count >= args.limit:
+            break
+        print(f"{obj.key:<50} {obj.size:>10} {_format_timestamp(obj.last_modified)}")
+        count += 1
     
-    print(f"\nTotal: {len(objects)} objects")
+    print(f"\nTotal: {count} objects")
 
 
 def cmd_metadata(args):
@@ -140,15 +179,19 @@ def cmd_versions(args):
     print(f"{'Version ID':<30} {'Size':>10} {'Modified':<20} {'Latest'}")
     print("-" * 72)
     
+    rows = []
     for version in versions:
         latest_mark = " *" if version.is_latest else ""
-        print(f"{version.version_id:<30} {version.size:>10} "
-              f"{version.last_modified.strftime('%Y-%m-%d %H:%M:%S')}{latest_mark}")
+        rows.append(f"{version.version_id:<30} {version.size:>10} "
+                    f"{_format_timestamp(version.last_modified)}{latest_mark}")
         
         if version.comment:
-            print(f"  Comment: {version.comment}")
+            rows.append(f"  Comment: {version.comment}")
         if version.tags:
-            print(f"  Tags: {version.tags}")
+            rows.append(f"  Tags: {version.tags}")
+    
+    if rows:
+        sys.stdout.write("\n".join(rows) + "\n")
     
     print(f"\nTotal: {len(versions)} versions")
 
@@ -227,8 +270,7 @@ def cmd_webhook_add(args):
     
     # Load existing config
     if config_file.exists():
-        with open(config_file, 'r') as f:
-            config = json.load(f)
+        config = _load_hook_config(config_file)
     else:
         config = {'webhooks': [], 'file_logs': []}
     
@@ -244,9 +286,7 @@ def cmd_webhook_add(args):
     config['webhooks'].append(webhook_config)
     
     # Save config
-    config_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(config_file, 'w') as f:
-        json.dump(config, f, indent=2)
+    _save_hook_config(config_file, config)
     
     print(f"[OK] Added webhook: {args.name}")
     print(f"  URL: {args.url}")
@@ -262,8 +302,7 @@ def cmd_webhook_list(args):
         print("No webhooks configured")
         return
     
-    with open(config_file, 'r') as f:
-        config = json.load(f)
+    config = _load_hook_config(config_file)
     
     print("\n=== Webhooks ===")
     for webhook in config.get('webhooks', []):
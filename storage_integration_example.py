@@ -7,8 +7,16 @@ Shows complete workflow: upload, metadata recording, version tracking, and audit
 """
 
 import os
+import sys
+import atexit
+import codecs
+import collections
+import contextlib
 import json
+import mimetypes
+import threading
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 
 # Import storage components
@@ -22,6 +30,11 @@ from src.storage import (
 )
 
 
+# Load the MIME table once; register types the platform table may lack
+mimetypes.init()
+mimetypes.add_type("application/vnd.apache.parquet", ".parquet")
+
+
 class StorageWithDatabase:
     """
     Integrated storage system with PostgreSQL metadata database.
@@ -41,7 +54,12 @@ class StorageWithDatabase:
         postgres_port=5432,
         postgres_db="puda_storage",
         postgres_user="puda",
-        postgres_password="puda"
+        postgres_password="puda",
+        max_concurrency=10,
+        sync_hooks=False,
+        drop_hook_events_when_full=False,
+        audit_buffer_size=1024,
+        audit_flush_interval=1.0
     ):
         """
         Initialize integrated storage system.
@@ -50,6 +68,14 @@ class StorageWithDatabase:
             storage_backend: "local" or "s3"
             storage_path: Path for local storage or S3 bucket name
             postgres_*: PostgreSQL connection parameters
+            max_concurrency: Parallel part uploads for large S3 objects
+            sync_hooks: Run integration hooks inline (e.g. for tests) instead
+                of on the hook manager's background worker
+            drop_hook_events_when_full: Drop integration events instead of
+                blocking storage calls while the hook queue is full
+            audit_buffer_size: Buffered download audit rows that trigger an
+                early flush (at half full)
+            audit_flush_interval: Seconds between background audit flushes
         """
         # Initialize PostgreSQL database
         self.db = PostgreSQLStorageDB(
@@ -61,6 +87,7 @@ class StorageWithDatabase:
         )
         
         # Initialize storage backend
+        self.storage_backend = storage_backend
         if storage_backend == "local":
             self.storage = LocalStorageManager(
                 base_path=storage_path,
@@ -73,14 +100,41 @@ class StorageWithDatabase:
                 endpoint_url=os.getenv("S3_ENDPOINT"),
                 aws_access_key_id=os.getenv("S3_ACCESS_KEY"),
                 aws_secret_access_key=os.getenv("S3_SECRET_KEY"),
-                enable_versioning=True
+                enable_versioning=True,
+                max_concurrency=max_concurrency
             )
         
         # Initialize version manager
         self.version_manager = VersionManager(self.storage)
         
-        # Initialize hook manager
-        self.hook_manager = IntegrationHookManager()
+        # Initialize hook manager (hooks run on a background worker by default
+        # so webhook round-trips don't add to upload/download latency)
+        self.hook_manager = IntegrationHookManager(
+            async_execution=not sync_hooks,
+            drop_when_full=drop_hook_events_when_full
+        )
+        
+        # Download audit rows are buffered and written in batches by a
+        # background thread instead of one INSERT per download
+        self._audit_buffer = collections.deque()
+        # Held while entries are popped and written, so a flush (e.g. before
+        # an audit query) waits for one already in progress
+        self._audit_flush_lock = threading.Lock()
+        self._audit_buffer_size = audit_buffer_size
+        self._audit_flush_interval = audit_flush_interval
+        self._audit_wakeup = threading.Event()
+        self._audit_stop = threading.Event()
+        self._audit_thread = threading.Thread(
+            target=self._audit_flush_loop,
+            name="audit-flush",
+            daemon=True
+        )
+        self._audit_thread.start()
+        
+        # The flusher is a daemon thread; write whatever is still buffered
+        # if the process exits without close()
+        self._closed = False
+        atexit.register(self.close)
         
         print(f"Storage initialized: {storage_backend}")
         print(f"Database: {postgres_host}:{postgres_port}/{postgres_db}")
@@ -106,35 +160,21 @@ class StorageWithDatabase:
         Returns:
             Upload result dict with object_id, version_id, etc.
         """
-        # Read file
-        with open(file_path, 'rb') as f:
-            data = f.read()
-        
         # Determine content type
-        content_type = "application/octet-stream"
-        if file_path.endswith('.pdf'):
-            content_type = "application/pdf"
-        elif file_path.endswith('.json'):
-            content_type = "application/json"
-        elif file_path.endswith('.txt'):
-            content_type = "text/plain"
-        
-        # Upload to storage backend
-        result = self.storage.put_object(
-            key=object_key,
-            data=data,
-            content_type=content_type,
-            metadata=metadata
-        )
+        content_type = self._guess_content_type(file_path)
+        
+        # Store file (size/etag computed by the backend)
+        result = self._put_file(file_path, object_key, content_type, metadata)
+        size = result.size
         
         # Record in PostgreSQL
         object_id = self.db.record_object(
             object_key=object_key,
-            size=len(data),
+            size=size,
             content_type=content_type,
             etag=result.etag,
             version_id=result.version_id,
-            storage_backend=self.storage.get_storage_info()['backend'].value,
+            storage_backend=self.storage_backend,
             metadata=metadata
         )
         
@@ -142,7 +182,7 @@ class StorageWithDatabase:
         self.db.record_version(
             object_key=object_key,
             version_id=result.version_id,
-            size=len(data),
+            size=size,
             etag=result.etag,
             is_latest=True,
             created_by=user_name or user_id,
@@ -157,7 +197,7 @@ class StorageWithDatabase:
             username=user_name,
             version_id=result.version_id,
             success=True,
-            metadata={"file_path": file_path, "size": len(data)}
+            metadata={"file_path": file_path, "size": size}
         )
         
         # Fire integration hook
@@ -165,7 +205,7 @@ class StorageWithDatabase:
             event=HookEvent.DOCUMENT_ARCHIVED,
             data={
                 "object_key": object_key,
-                "size": len(data),
+                "size": size,
                 "version_id": result.version_id,
                 "metadata": metadata
             }
@@ -176,10 +216,196 @@ class StorageWithDatabase:
             "object_key": object_key,
             "version_id": result.version_id,
             "etag": result.etag,
-            "size": len(data),
+            "size": size,
             "content_type": content_type
         }
     
+    def _put_file(self, file_path: str, object_key: str, content_type: str, metadata: dict = None):
+        """Store a local file, using a kernel-side copy on the local backend."""
+        if isinstance(self.storage, LocalStorageManager):
+            return self.storage.put_object_from_path(
+                file_path,
+                key=object_key,
+                content_type=content_type,
+                metadata=metadata
+            )
+        
+        # Stream everything else so the file is never fully buffered
+        with open(file_path, 'rb') as f:
+            return self.storage.put_object_stream(
+                key=object_key,
+                fileobj=f,
+                content_type=content_type,
+                metadata=metadata
+            )
+    
+    def upload_documents(
+        self,
+        files: list,
+        user_id: str = None,
+        user_name: str = None
+    ) -> list:
+        """
+        Upload a batch of documents, recording all metadata in one transaction.
+        
+        Args:
+            files: List of dicts with file_path, object_key and optional metadata
+            user_id: User performing upload
+            user_name: Username
+        
+        Returns:
+            List of upload result dicts (same shape as upload_document)
+        """
+        uploads = []
+        for item in files:
+            file_path = item["file_path"]
+            object_key = item["object_key"]
+            metadata = item.get("metadata")
+            
+            content_type = self._guess_content_type(file_path)
+            result = self._put_file(file_path, object_key, content_type, metadata)
+            
+            uploads.append({
+                "object_key": object_key,
+                "size": result.size,
+                "content_type": content_type,
+                "etag": result.etag,
+                "version_id": result.version_id,
+                "storage_backend": self.storage_backend,
+                "metadata": metadata,
+                "created_by": user_name or user_id,
+                "comment": f"Uploaded from {file_path}",
+                "user_id": user_id,
+                "username": user_name,
+                "audit_metadata": {"file_path": file_path, "size": result.size}
+            })
+        
+        # Single transaction for object/version/audit rows
+        object_ids = self.db.record_uploads(uploads)
+        
+        results = []
+        for upload in uploads:
+            self.hook_manager.fire_event(
+                event=HookEvent.DOCUMENT_ARCHIVED,
+                data={
+                    "object_key": upload["object_key"],
+                    "size": upload["size"],
+                    "version_id": upload["version_id"],
+                    "metadata": upload["metadata"]
+                }
+            )
+            results.append({
+                "object_id": object_ids.get(upload["object_key"]),
+                "object_key": upload["object_key"],
+                "version_id": upload["version_id"],
+                "etag": upload["etag"],
+                "size": upload["size"],
+                "content_type": upload["content_type"]
+            })
+        
+        return results
+    
+    def bulk_import(
+        self,
+        files,
+        user_id: str = None,
+        user_name: str = None,
+        batch_size: int = 1000,
+        drop_indexes: bool = False
+    ) -> int:
+        """
+        Import a large number of documents in batches.
+        
+        Args:
+            files: Iterable of dicts with file_path, object_key and optional metadata
+            user_id: User performing upload
+            user_name: Username
+            batch_size: Documents recorded per transaction
+            drop_indexes: Drop secondary indexes during the load and rebuild them
+                afterwards. Much faster for initial seeding, but searches are
+                unindexed until the import finishes.
+        
+        Returns:
+            Number of documents imported
+        """
+        files = iter(files)
+        imported = 0
+        
+        with self.db.deferred_indexes() if drop_indexes else contextlib.nullcontext():
+            while True:
+                batch = list(islice(files, batch_size))
+                if not batch:
+                    break
+                imported += len(self.upload_documents(batch, user_id=user_id, user_name=user_name))
+        
+        return imported
+    
+    @staticmethod
+    def _guess_content_type(file_path: str) -> str:
+        """Determine content type from file extension."""
+        return mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+    
+    def iter_document(
+        self,
+        object_key: str,
+        version_id: str = None,
+        user_id: str = None,
+        user_name: str = None,
+        output_path: str = None
+    ):
+        """
+        Stream a document from storage in chunks, with audit logging.
+        
+        The audit entry is recorded when the stream ends, whether it was
+        fully consumed, closed early by the caller or failed part way, with
+        the number of bytes actually delivered. The integration hook fires
+        unless the storage read failed.
+        
+        Args:
+            object_key: Storage key
+            version_id: Optional specific version
+            user_id: User performing download
+            user_name: Username
+            output_path: Destination recorded in the audit entry
+        
+        Yields:
+            Document data chunks
+        """
+        size = 0
+        completed = False
+        error = None
+        try:
+            for chunk in self.storage.get_object_stream(object_key, version_id=version_id):
+                size += len(chunk)
+                yield chunk
+            completed = True
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            # Log audit (written by the background flusher)
+            self._buffer_audit(
+                action="DOWNLOAD",
+                object_key=object_key,
+                user_id=user_id,
+                username=user_name,
+                version_id=version_id,
+                success=error is None,
+                error_message=error,
+                metadata={"output_path": output_path, "size": size, "complete": completed}
+            )
+            
+            # Fire integration hook
+            if error is None:
+                self.hook_manager.fire_event(
+                    event=HookEvent.DOCUMENT_RETRIEVED,
+                    data={
+                        "object_key": object_key,
+                        "version_id": version_id,
+                        "size": size
+                    }
+                )
+    
     def download_document(
         self,
         object_key: str,
@@ -187,10 +413,14 @@ class StorageWithDatabase:
         version_id: str = None,
         user_id: str = None,
         user_name: str = None
-    ) -> bytes:
+    ):
         """
         Download document with audit logging.
         
+        With output_path the document is streamed to the file chunk by chunk
+        and never held in memory; otherwise this is download_document_bytes.
+        Use iter_document to consume the chunks directly.
+        
         Args:
             object_key: Storage key
             output_path: Optional path to save file
@@ -199,38 +429,88 @@ class StorageWithDatabase:
             user_name: Username
         
         Returns:
-            Document data as bytes
+            output_path when given, else document data as bytes
         """
-        # Download from storage
-        data = self.storage.get_object(object_key, version_id=version_id)
+        if output_path is None:
+            return self.download_document_bytes(
+                object_key,
+                version_id=version_id,
+                user_id=user_id,
+                user_name=user_name
+            )
         
-        # Save to file if requested
-        if output_path:
-            with open(output_path, 'wb') as f:
-                f.write(data)
+        with open(output_path, 'wb') as f:
+            for chunk in self.iter_document(
+                object_key,
+                version_id=version_id,
+                user_id=user_id,
+                user_name=user_name,
+                output_path=output_path
+            ):
+                f.write(chunk)
         
-        # Log audit
-        self.db.log_audit(
-            action="DOWNLOAD",
-            object_key=object_key,
-            user_id=user_id,
-            username=user_name,
+        return output_path
+    
+    def download_document_bytes(
+        self,
+        object_key: str,
+        version_id: str = None,
+        user_id: str = None,
+        user_name: str = None
+    ) -> bytes:
+        """
+        Download a whole document into memory, with audit logging.
+        
+        Args:
+            object_key: Storage key
+            version_id: Optional specific version
+            user_id: User performing download
+            user_name: Username
+        
+        Returns:
+            Document data as bytes
+        """
+        return b"".join(self.iter_document(
+            object_key,
             version_id=version_id,
-            success=True,
-            metadata={"output_path": output_path, "size": len(data)}
-        )
+            user_id=user_id,
+            user_name=user_name
+        ))
+    
+    def download_document_text(
+        self,
+        object_key: str,
+        version_id: str = None,
+        user_id: str = None,
+        user_name: str = None,
+        encoding: str = "utf-8"
+    ) -> str:
+        """
+        Download a text document, decoding it as it streams.
         
-        # Fire integration hook
-        self.hook_manager.fire_event(
-            event=HookEvent.DOCUMENT_RETRIEVED,
-            data={
-                "object_key": object_key,
-                "version_id": version_id,
-                "size": len(data)
-            }
-        )
+        Args:
+            object_key: Storage key
+            version_id: Optional specific version
+            user_id: User performing download
+            user_name: Username
+            encoding: Text encoding of the document
         
-        return data
+        Returns:
+            Document contents as str
+        """
+        # Decode chunk by chunk so the full payload never exists as bytes
+        decoder = codecs.getincrementaldecoder(encoding)()
+        parts = [
+            decoder.decode(chunk)
+            for chunk in self.iter_document(
+                object_key,
+                version_id=version_id,
+                user_id=user_id,
+                user_name=user_name
+            )
+        ]
+        parts.append(decoder.decode(b"", final=True))
+        return "".join(parts)
     
     def search_documents(
         self,
@@ -244,8 +524,8 @@ class StorageWithDatabase:
         
         Args:
             search_query: Full-text search query
-            prefix: Key prefix filter
-            metadata_filters: Metadata filters (not implemented yet)
+            prefix: Key prefix filter (combined with search_query when both are given)
+            metadata_filters: Metadata key/value pairs the documents must contain
             limit: Maximum results
         
         Returns:
@@ -253,10 +533,19 @@ class StorageWithDatabase:
         """
         if search_query:
             # Full-text search
-            return self.db.search_objects(search_query, limit=limit)
+            return self.db.search_objects(
+                search_query,
+                limit=limit,
+                metadata_filters=metadata_filters,
+                prefix=prefix
+            )
         else:
             # Prefix listing
-            return self.db.list_objects(prefix=prefix, limit=limit)
+            return self.db.list_objects(
+                prefix=prefix,
+                limit=limit,
+                metadata_filters=metadata_filters
+            )
     
     def get_version_history(self, object_key: str) -> list:
         """Get complete version history for document."""
@@ -269,6 +558,8 @@ class StorageWithDatabase:
         limit: int = 1000
     ) -> list:
         """Get audit trail for document or user."""
+        # Make buffered and in-flight entries visible first
+        self._flush_audit()
         return self.db.get_audit_logs(
             object_key=object_key,
             user_id=user_id,
@@ -278,6 +569,70 @@ class StorageWithDatabase:
     def get_statistics(self) -> dict:
         """Get overall storage statistics."""
         return self.db.get_statistics()
+    
+    def _buffer_audit(self, **entry):
+        """Queue an audit entry for the background flusher."""
+        entry["timestamp"] = datetime.now()
+        self._audit_buffer.append(entry)
+        if len(self._audit_buffer) >= self._audit_buffer_size // 2:
+            self._audit_wakeup.set()
+    
+    def _flush_audit(self):
+        """Write all buffered audit entries in one batch.
+        
+        If the batch is rejected, entries are retried one at a time so a
+        single bad row only loses itself (the database logs each failure).
+        """
+        with self._audit_flush_lock:
+            entries = []
+            while self._audit_buffer:
+                try:
+                    entries.append(self._audit_buffer.popleft())
+                except IndexError:
+                    break
+            
+            if not entries:
+                return
+            
+            try:
+                self.db.log_audit_batch(entries)
+            except Exception:
+                for entry in entries:
+                    try:
+                        self.db.log_audit_batch([entry])
+                    except Exception:
+                        pass
+    
+    def _audit_flush_loop(self):
+        """Background thread: flush audit entries periodically or when half full."""
+        while not self._audit_stop.is_set():
+            self._audit_wakeup.wait(self._audit_flush_interval)
+            self._audit_wakeup.clear()
+            self._flush_audit()
+    
+    def close(self):
+        """Drain pending integration hooks and audit entries, then close the database pool."""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        
+        self.hook_manager.flush()
+        
+        self._audit_stop.set()
+        self._audit_wakeup.set()
+        self._audit_thread.join()
+        self._flush_audit()
+        
+        self.db.close()
+    
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
 
 
 def main():
@@ -303,9 +658,10 @@ def main():
     
     # Create test file
     test_file = "test_document.txt"
-    with open(test_file, 'w') as f:
-        f.write("This is a test document for storage integration.\n")
-        f.write(f"Created at: {datetime.now().isoformat()}\n")
+    Path(test_file).write_text(
+        "This is a test document for storage integration.\n"
+        f"Created at: {datetime.now().isoformat()}\n"
+    )
     
     # Upload document
     result = storage.upload_document(
@@ -381,16 +737,18 @@ def main():
     print("\n6. Download Document")
     print("-" * 70)
     
-    data = storage.download_document(
+    data = storage.download_document_bytes(
         object_key="test/integration/document.txt",
-        output_path="downloaded_document.txt",
         user_id="user456",
         user_name="jane@example.com"
     )
     
     print(f"Downloaded {len(data)} bytes")
     print("Content:")
-    print(data.decode('utf-8'))
+    sys.stdout.flush()
+    sys.stdout.buffer.write(data)
+    sys.stdout.buffer.flush()
+    sys.stdout.write("\n")
     
     print("\n7. Storage Statistics")
     print("-" * 70)
@@ -410,15 +768,14 @@ def main():
     print(f"Audit logs (24h): {stats['recent_audits_24h']}")
     print(f"Hook executions (24h): {stats['recent_hooks_24h']}")
     
+    storage.close()
+    
     print("\n" + "=" * 70)
     print("Integration example completed successfully!")
     print("=" * 70)
     
     # Cleanup test files
-    if os.path.exists(test_file):
-        os.remove(test_file)
-    if os.path.exists("downloaded_document.txt"):
-        os.remove("downloaded_document.txt")
+    Path(test_file).unlink(missing_ok=True)
 
 
 if __name__ == "__main__":
@@ -9,16 +9,33 @@ Usage:
 """
 
 import argparse
+import functools
+import importlib.util
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict
-import csv
+from itertools import chain, islice, repeat
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Iterable, Iterator
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.ml.summarizer import DocumentSummarizer, SummaryResult
+# The summarizer, csv and pyarrow are imported where they are used so that
+# --help and argument errors don't pay for them
+if TYPE_CHECKING:
+    from src.ml.summarizer import DocumentSummarizer, SummaryResult
+
+# Rows per record batch when writing CSV with pyarrow
+CSV_BATCH_SIZE = 1000
+
+
+@functools.lru_cache(maxsize=1)
+def _get_summarizer() -> 'DocumentSummarizer':
+    """Get the process-wide DocumentSummarizer (built on first use)."""
+    from src.ml.summarizer import DocumentSummarizer
+    return DocumentSummarizer()
 
 
 def summarize_text(
@@ -43,7 +60,7 @@ def summarize_text(
     Returns:
         Formatted summary
     """
-    summarizer = DocumentSummarizer()
+    summarizer = _get_summarizer()
     result = summarizer.summarize(text, method=method, length=length, include_bullets=include_bullets)
     
     if format_type == 'json':
@@ -52,58 +69,51 @@ def summarize_text(
         return format_text(result, include_stats, include_bullets)
 
 
-def format_text(result: SummaryResult, include_stats: bool, include_bullets: bool) -> str:
+def format_text(result: 'SummaryResult', include_stats: bool, include_bullets: bool) -> str:
     """Format summary as human-readable text."""
-    output = []
-    
-    output.append("=" * 70)
-    output.append("DOCUMENT SUMMARY")
-    output.append("=" * 70)
-    output.append("")
-    output.append(result.summary)
-    output.append("")
+    stats = result.statistics
+    rule = "-" * 70
     
+    bullets = ""
     if include_bullets and result.bullet_points:
-        output.append("-" * 70)
-        output.append("KEY POINTS:")
-        output.append("-" * 70)
-        for i, bullet in enumerate(result.bullet_points, 1):
-            output.append(f"{i}. {bullet}")
-        output.append("")
+        points = "\n".join(f"{i}. {bullet}" for i, bullet in enumerate(result.bullet_points, 1))
+        bullets = f"{rule}\nKEY POINTS:\n{rule}\n{points}\n\n"
     
+    statistics = ""
     if include_stats:
-        output.append("-" * 70)
-        output.append("SUMMARY STATISTICS:")
-        output.append("-" * 70)
-        output.append(f"Method:           {result.method.title()}")
-        output.append(f"Length:           {result.length.title()}")
-        output.append(f"Confidence:       {result.confidence:.1%}")
-        output.append(f"Document Type:    {result.statistics.get('document_type', 'unknown').title()}")
-        output.append(f"Original Words:   {result.statistics.get('original_words', 0)}")
-        output.append(f"Summary Words:    {result.statistics.get('summary_words', 0)}")
-        output.append(f"Reduction:        {result.reduction_ratio:.1f}%")
-        output.append(f"Sentences:        {result.statistics.get('summary_sentences', 0)}/{result.statistics.get('original_sentences', 0)}")
-        output.append("")
-    
-    return "\n".join(output)
-
-
-def format_json(result: SummaryResult, include_stats: bool) -> str:
+        statistics = f"""{rule}
+SUMMARY STATISTICS:
+{rule}
+Method:           {result.method.title()}
+Length:           {result.length.title()}
+Confidence:       {result.confidence:.1%}
+Document Type:    {stats.get('document_type', 'unknown').title()}
+Original Words:   {stats.get('original_words', 0)}
+Summary Words:    {stats.get('summary_words', 0)}
+Reduction:        {result.reduction_ratio:.1f}%
+Sentences:        {stats.get('summary_sentences', 0)}/{stats.get('original_sentences', 0)}
+
+"""
+    
+    header = "=" * 70
+    # Every section ends with a blank line; drop the final newline
+    return f"{header}\nDOCUMENT SUMMARY\n{header}\n\n{result.summary}\n\n{bullets}{statistics}"[:-1]
+
+
+def format_json(result: 'SummaryResult', include_stats: bool) -> str:
     """Format summary as JSON."""
     data = {
         'summary': result.summary,
         'method': result.method,
         'length': result.length,
-        'confidence': round(result.confidence, 3)
+        'confidence': round(result.confidence, 3),
+        **({'bullet_points': result.bullet_points} if result.bullet_points else {}),
+        **({
+            'statistics': result.statistics,
+            'reduction_ratio': round(result.reduction_ratio, 1)
+        } if include_stats else {})
     }
     
-    if result.bullet_points:
-        data['bullet_points'] = result.bullet_points
-    
-    if include_stats:
-        data['statistics'] = result.statistics
-        data['reduction_ratio'] = round(result.reduction_ratio, 1)
-    
     return json.dumps(data, indent=2, ensure_ascii=False)
 
 
@@ -131,105 +141,270 @@ def summarize_file(
         return f"Error processing file: {str(e)}"
 
 
+def _iter_text_files(root: str, recursive: bool) -> Iterator[str]:
+    """Yield paths of .txt files under root, walking with os.scandir."""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if recursive:
+                        stack.append(entry.path)
+                elif entry.name.endswith('.txt'):
+                    yield entry.path
+
+
+def _summarize_one(
+    file_path: str,
+    method: str,
+    length: str,
+    include_bullets: bool
+) -> Tuple[str, Optional[Dict], str]:
+    """
+    Summarize a single file for batch processing (runs in a worker process).
+    
+    Returns:
+        Tuple of (file path, result row or None, status message)
+    """
+    summarizer = _get_summarizer()
+    
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        
+        if not text.strip():
+            return file_path, None, "  ⚠️  Skipping empty file"
+        
+        result = summarizer.summarize(text, method=method, length=length, include_bullets=include_bullets)
+        stats = result.statistics
+        
+        row = {
+            'file': file_path,
+            'filename': os.path.basename(file_path),
+            'summary': result.summary,
+            'method': result.method,
+            'length': result.length,
+            'confidence': result.confidence,
+            'doc_type': stats.get('document_type', 'unknown'),
+            'original_words': stats.get('original_words', 0),
+            'summary_words': stats.get('summary_words', 0),
+            'reduction': result.reduction_ratio,
+            'bullet_points': '; '.join(result.bullet_points) if result.bullet_points else ''
+        }
+        
+        return file_path, row, (f"  ✓ Summarized ({row['summary_words']} words, "
+                     f"{result.confidence:.1%} confidence)")
+    
+    except Exception as e:
+        return file_path, None, f"  ✗ Error: {str(e)}"
+
+
 def batch_summarize(
     directory: str,
     method: str = 'extractive',
     length: str = 'medium',
-    output_file: str = None,
     recursive: bool = False,
-    include_bullets: bool = True
-) -> List[Dict]:
+    include_bullets: bool = True,
+    workers: int = None
+) -> Iterator[Dict]:
     """
     Summarize all text files in a directory.
     
+    Files are summarized in parallel worker processes and results are
+    yielded in directory order as soon as they are ready, so callers can
+    write them out without holding the whole batch in memory.
+    
     Args:
         directory: Path to directory
         method: Summarization method
         length: Summary length
-        output_file: Optional CSV output file
         recursive: Search subdirectories
         include_bullets: Include bullet points
+        workers: Number of worker processes (None = CPU count)
         
-    Returns:
-        List of summary results
+    Yields:
+        Summary result rows
     """
-    dir_path = Path(directory)
-    if not dir_path.exists():
+    if not os.path.isdir(directory):
         print(f"Error: Directory '{directory}' not found")
-        return []
+        return
     
-    # Find text files
-    if recursive:
-        text_files = list(dir_path.rglob('*.txt'))
-    else:
-        text_files = list(dir_path.glob('*.txt'))
+    found = 0
+    processed = 0
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Files are handed to the pool as the walk finds them
+        outcomes = executor.map(
+            _summarize_one,
+            _iter_text_files(directory, recursive),
+            repeat(method),
+            repeat(length),
+            repeat(include_bullets),
+            chunksize=4
+        )
+        
+        for found, (file_path, row, status) in enumerate(outcomes, 1):
+            print(f"[{found}] Processed: {os.path.basename(file_path)}")
+            print(status)
+            if row is not None:
+                processed += 1
+                yield row
     
-    if not text_files:
+    if not found:
         print(f"No .txt files found in '{directory}'")
-        return []
+        return
     
-    print(f"Found {len(text_files)} text files")
     print()
+    print(f"Processed {processed} files successfully")
+
+
+def save_to_csv(results: Iterable[Dict], output_file: str) -> int:
+    """
+    Stream batch results to a CSV file.
     
-    summarizer = DocumentSummarizer()
-    results = []
-    
-    for i, file_path in enumerate(text_files, 1):
-        print(f"[{i}/{len(text_files)}] Processing: {file_path.name}")
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
-            
-            if not text.strip():
-                print(f"  ⚠️  Skipping empty file")
-                continue
-            
-            result = summarizer.summarize(text, method=method, length=length, include_bullets=include_bullets)
-            
-            results.append({
-                'file': str(file_path),
-                'filename': file_path.name,
-                'summary': result.summary,
-                'method': result.method,
-                'length': result.length,
-                'confidence': result.confidence,
-                'doc_type': result.statistics.get('document_type', 'unknown'),
-                'original_words': result.statistics.get('original_words', 0),
-                'summary_words': result.statistics.get('summary_words', 0),
-                'reduction': result.reduction_ratio,
-                'bullet_points': '; '.join(result.bullet_points) if result.bullet_points else ''
-            })
-            
-            print(f"  ✓ Summarized ({result.statistics.get('summary_words', 0)} words, "
-                  f"{result.confidence:.1%} confidence)")
-        
-        except Exception as e:
-            print(f"  ✗ Error: {str(e)}")
-    
-    print()
-    print(f"Processed {len(results)} files successfully")
+    Rows are written as they arrive; the header is taken from the first row.
+    Uses pyarrow's C++ CSV writer in record batches when available, falling
+    back to csv.DictWriter.
     
-    # Save to CSV if requested
-    if output_file and results:
-        save_to_csv(results, output_file)
+    Returns:
+        Number of rows written
+    """
+    rows = iter(results)
+    first = next(rows, None)
+    if first is None:
+        return 0
     
-    return results
-
-
-def save_to_csv(results: List[Dict], output_file: str):
-    """Save batch results to CSV file."""
+    count = 0
     try:
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            if results:
-                writer = csv.DictWriter(f, fieldnames=results[0].keys())
+        if importlib.util.find_spec('pyarrow') is not None:
+            count = _write_csv_pyarrow(chain([first], rows), output_file)
+        else:
+            import csv
+            
+            with open(output_file, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=list(first.keys()), quoting=csv.QUOTE_ALL)
                 writer.writeheader()
-                writer.writerows(results)
+                for row in chain([first], rows):
+                    writer.writerow(row)
+                    count += 1
         
         print(f"✓ Results saved to: {output_file}")
     
     except Exception as e:
         print(f"✗ Error saving CSV: {str(e)}")
+    
+    return count
+
+
+def _csv_cell(value) -> str:
+    """Format a value the way the csv module does (str(), None as empty)."""
+    return '' if value is None else str(value)
+
+
+def _write_csv_pyarrow(rows: Iterator[Dict], output_file: str) -> int:
+    """Write rows to CSV in record batches using pyarrow."""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    
+    count = 0
+    writer = None
+    fieldnames = None
+    schema = None
+    # Cells are pre-formatted as strings so numbers render exactly as
+    # csv.DictWriter renders them (Arrow would write 90.0 as 90); Arrow then
+    # quotes every field, matching the csv.QUOTE_ALL fallback, and CRLF
+    # matches its line endings
+    write_options = pa_csv.WriteOptions(quoting_style="needed", eol="\r\n")
+    try:
+        while True:
+            batch = list(islice(rows, CSV_BATCH_SIZE))
+            if not batch:
+                break
+            
+            if writer is None:
+                # Columns are taken from the first row
+                fieldnames = list(batch[0].keys())
+                schema = pa.schema([(name, pa.string()) for name in fieldnames])
+                writer = pa_csv.CSVWriter(output_file, schema, write_options=write_options)
+            
+            record_batch = pa.RecordBatch.from_arrays(
+                [pa.array([_csv_cell(row.get(name)) for row in batch], type=pa.string())
+                 for name in fieldnames],
+                schema=schema
+            )
+            writer.write_batch(record_batch)
+            count += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    return count
+
+
+def _run_text(args: argparse.Namespace):
+    """Summarize text given on the command line."""
+    output = summarize_text(
+        args.text,
+        method=args.method,
+        length=args.length,
+        format_type=args.format,
+        include_stats=args.stats,
+        include_bullets=not args.no_bullets
+    )
+    print(output)
+
+
+def _run_file(args: argparse.Namespace):
+    """Summarize a single file."""
+    output = summarize_file(
+        args.file,
+        method=args.method,
+        length=args.length,
+        format_type=args.format,
+        include_stats=args.stats,
+        include_bullets=not args.no_bullets
+    )
+    print(output)
+
+
+def _run_batch(args: argparse.Namespace):
+    """Summarize a directory of files."""
+    results = batch_summarize(
+        args.batch,
+        method=args.method,
+        length=args.length,
+        recursive=args.recursive,
+        include_bullets=not args.no_bullets,
+        workers=args.workers
+    )
+    
+    if args.output:
+        # Stream rows straight to CSV
+        save_to_csv(results, args.output)
+        return
+    
+    results = list(results)
+    
+    # Display summary statistics
+    print()
+    print("=" * 70)
+    print("BATCH SUMMARY")
+    print("=" * 70)
+    if results:
+        avg_confidence = sum(r['confidence'] for r in results) / len(results)
+        avg_reduction = sum(r['reduction'] for r in results) / len(results)
+        
+        print(f"Files processed:    {len(results)}")
+        print(f"Avg confidence:     {avg_confidence:.1%}")
+        print(f"Avg reduction:      {avg_reduction:.1f}%")
+        
+        # Document type distribution
+        doc_types = {}
+        for r in results:
+            dt = r['doc_type']
+            doc_types[dt] = doc_types.get(dt, 0) + 1
+        
+        print(f"Document types:     {', '.join(f'{k}({v})' for k, v in doc_types.items())}")
 
 
 def main():
@@ -321,66 +496,22 @@ Lengths:
         action='store_true',
         help='Process subdirectories recursively'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Worker processes for batch mode (default: CPU count)'
+    )
     
     args = parser.parse_args()
     
-    # Process based on input type
+    # Dispatch to the handler for the chosen input type
     if args.text:
-        # Summarize text directly
-        output = summarize_text(
-            args.text,
-            method=args.method,
-            length=args.length,
-            format_type=args.format,
-            include_stats=args.stats,
-            include_bullets=not args.no_bullets
-        )
-        print(output)
-    
+        _run_text(args)
     elif args.file:
-        # Summarize single file
-        output = summarize_file(
-            args.file,
-            method=args.method,
-            length=args.length,
-            format_type=args.format,
-            include_stats=args.stats,
-            include_bullets=not args.no_bullets
-        )
-        print(output)
-    
-    elif args.batch:
-        # Batch summarization
-        results = batch_summarize(
-            args.batch,
-            method=args.method,
-            length=args.length,
-            output_file=args.output,
-            recursive=args.recursive,
-            include_bullets=not args.no_bullets
-        )
-        
-        if not args.output:
-            # Display summary statistics
-            print()
-            print("=" * 70)
-            print("BATCH SUMMARY")
-            print("=" * 70)
-            if results:
-                avg_confidence = sum(r['confidence'] for r in results) / len(results)
-                avg_reduction = sum(r['reduction'] for r in results) / len(results)
-                
-                print(f"Files processed:    {len(results)}")
-                print(f"Avg confidence:     {avg_confidence:.1%}")
-                print(f"Avg reduction:      {avg_reduction:.1f}%")
-                
-                # Document type distribution
-                doc_types = {}
-                for r in results:
-                    dt = r['doc_type']
-                    doc_types[dt] = doc_types.get(dt, 0) + 1
-                
-                print(f"Document types:     {', '.join(f'{k}({v})' for k, v in doc_types.items())}")
+        _run_file(args)
+    else:
+        _run_batch(args)
 
 
 if __name__ == '__main__':
@@ -5,92 +5,90 @@ Test Authorization Layer
 Tests user management, ABAC, PII detection, audit logging, and encryption.
 """
 
-import sys
+import logging
 from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent))
+import pytest
 
-from src.authorization import (
-    UserManager, PolicyEngine, PIIDetector,
-    AuditLogger, EncryptionManager, ConfidentialityLevel
-)
+from src.authorization import PolicyEngine, EncryptionManager, ConfidentialityLevel
 
+log = logging.getLogger(__name__)
 
-def test_user_management():
+
+# Users shared by the user-management and policy tests
+TEST_USERS = {
+    "john_doe": dict(
+        password="password123",
+        department="finance",
+        clearance_level=2,
+        roles=["viewer", "operator"],
+        email="john@example.com"
+    ),
+    "jane_smith": dict(
+        password="secure456",
+        department="hr",
+        clearance_level=1,
+        roles=["viewer"],
+        email="jane@example.com"
+    ),
+}
+
+
+def _get_or_create_user(user_mgr, username):
+    """Fetch a TEST_USERS user, creating it if this worker hasn't yet."""
+    return user_mgr.get_user_by_username(username) or user_mgr.create_user(
+        username=username, **TEST_USERS[username]
+    )
+
+
+def test_user_management(user_mgr, admin_session):
     """Test user management and authentication."""
-    print("\n=== Testing User Management ===")
-    
-    user_mgr = UserManager(db_path="data/test_users.db")
+    log.info("=== Testing User Management ===")
     
-    # Test default admin user
-    try:
-        admin = user_mgr.authenticate("admin", "admin")
-        print(f"[OK] Admin authentication successful: {admin.username}")
-        print(f"  Department: {admin.department}")
-        print(f"  Clearance: {admin.clearance_level}")
-        print(f"  Roles: {admin.roles}")
-    except Exception as e:
-        print(f"[X] Admin authentication failed: {e}")
+    # Test default admin user (authenticated once by the admin_session fixture)
+    admin = user_mgr.validate_session(admin_session)
+    assert admin is not None
+    log.info("[OK] Admin authentication successful: %s", admin.username)
+    log.info("  Department: %s", admin.department)
+    log.info("  Clearance: %s", admin.clearance_level)
+    log.info("  Roles: %s", admin.roles)
     
     # Create test users
-    print("\nCreating test users...")
+    log.info("Creating test users...")
     try:
-        user1 = user_mgr.create_user(
-            username="john_doe",
-            password="password123",
-            department="finance",
-            clearance_level=2,
-            roles=["viewer", "operator"],
-            email="john@example.com"
-        )
-        print(f"[OK] Created user: {user1.username} (Finance, Clearance 2)")
+        user1 = user_mgr.create_user(username="john_doe", **TEST_USERS["john_doe"])
+        log.info("[OK] Created user: %s (Finance, Clearance 2)", user1.username)
         
-        user2 = user_mgr.create_user(
-            username="jane_smith",
-            password="secure456",
-            department="hr",
-            clearance_level=1,
-            roles=["viewer"],
-            email="jane@example.com"
-        )
-        print(f"[OK] Created user: {user2.username} (HR, Clearance 1)")
+        user2 = user_mgr.create_user(username="jane_smith", **TEST_USERS["jane_smith"])
+        log.info("[OK] Created user: %s (HR, Clearance 1)", user2.username)
     except ValueError as e:
-        print(f"Note: {e}")
+        log.info("Note: %s", e)
     
     # Test authentication
-    print("\nTesting authentication...")
-    try:
-        user = user_mgr.authenticate("john_doe", "password123")
-        print(f"[OK] Authentication successful for {user.username}")
-        
-        # Create session
-        session_id = user_mgr.create_session(user, ip_address="127.0.0.1")
-        print(f"[OK] Session created: {session_id[:16]}...")
-        
-        # Validate session
-        validated_user = user_mgr.validate_session(session_id)
-        if validated_user:
-            print(f"[OK] Session validated for {validated_user.username}")
-        
-    except Exception as e:
-        print(f"[X] Authentication failed: {e}")
+    log.info("Testing authentication...")
+    user = user_mgr.authenticate("john_doe", "password123")
+    log.info("[OK] Authentication successful for %s", user.username)
+    
+    # Create session
+    session_id = user_mgr.create_session(user, ip_address="127.0.0.1")
+    log.info("[OK] Session created: %s...", session_id[:16])
     
-    user_mgr.close()
-    print("\n[OK] User management tests completed")
+    # Validate session
+    validated_user = user_mgr.validate_session(session_id)
+    assert validated_user is not None
+    log.info("[OK] Session validated for %s", validated_user.username)
+    
+    log.info("[OK] User management tests completed")
 
 
-def test_policy_engine():
+def test_policy_engine(user_mgr, admin_session):
     """Test ABAC policy engine."""
-    print("\n=== Testing Policy Engine ===")
+    log.info("=== Testing Policy Engine ===")
     
     engine = PolicyEngine()
     
-    # Create test user and documents
-    user_mgr = UserManager(db_path="data/test_users.db")
-    
-    # Test with admin
-    admin = user_mgr.authenticate("admin", "admin")
+    # Test with admin, reusing the module's session instead of re-authenticating
+    admin = user_mgr.validate_session(admin_session)
     
     # Test documents with various confidentiality levels
     documents = [
@@ -114,39 +112,35 @@ def test_policy_engine():
         },
     ]
     
-    print("\nTesting admin access:")
-    for doc in documents:
-        allowed = engine.check_access(admin, doc)
-        print(f"  {doc['page_id']} (Level {doc['confidentiality_level']}): {'[OK] Allowed' if allowed else '[X] Denied'}")
+    log.info("Testing admin access:")
+    for doc, allowed in zip(documents, engine.check_access_many(admin, documents)):
+        log.info("  %s (Level %s): %s", doc['page_id'], doc['confidentiality_level'], '[OK] Allowed' if allowed else '[X] Denied')
     
     # Test with regular user
-    print("\nTesting john_doe access (Finance, Clearance 2):")
-    john = user_mgr.get_user_by_username("john_doe")
+    log.info("Testing john_doe access (Finance, Clearance 2):")
+    john = _get_or_create_user(user_mgr, "john_doe")
     if john:
-        for doc in documents:
-            allowed = engine.check_access(john, doc)
+        for doc, allowed in zip(documents, engine.check_access_many(john, documents)):
             explanation = engine.explain_decision(john, doc)
-            print(f"  {doc['page_id']} (Level {doc['confidentiality_level']}): {'[OK] Allowed' if allowed else '[X] Denied'}")
+            log.info("  %s (Level %s): %s", doc['page_id'], doc['confidentiality_level'], '[OK] Allowed' if allowed else '[X] Denied')
             if explanation['matched_rules']:
-                print(f"    Matched rule: {explanation['matched_rules'][0]['name']}")
+                log.info("    Matched rule: %s", explanation['matched_rules'][0]['name'])
     
     # Test with jane (HR, lower clearance)
-    print("\nTesting jane_smith access (HR, Clearance 1):")
-    jane = user_mgr.get_user_by_username("jane_smith")
+    log.info("Testing jane_smith access (HR, Clearance 1):")
+    jane = _get_or_create_user(user_mgr, "jane_smith")
     if jane:
-        for doc in documents:
-            allowed = engine.check_access(jane, doc)
-            print(f"  {doc['page_id']} (Level {doc['confidentiality_level']}): {'[OK] Allowed' if allowed else '[X] Denied'}")
+        for doc, allowed in zip(documents, engine.check_access_many(jane, documents)):
+            log.info("  %s (Level %s): %s", doc['page_id'], doc['confidentiality_level'], '[OK] Allowed' if allowed else '[X] Denied')
     
-    user_mgr.close()
-    print("\n[OK] Policy engine tests completed")
+    log.info("[OK] Policy engine tests completed")
 
 
-def test_pii_detection():
+def test_pii_detection(pii_detector):
     """Test PII detection."""
-    print("\n=== Testing PII Detection ===")
+    log.info("=== Testing PII Detection ===")
     
-    detector = PIIDetector()
+    detector = pii_detector
     
     # Test texts with PII
     test_cases = [
@@ -159,174 +153,147 @@ def test_pii_detection():
     
     for text, description in test_cases:
         matches = detector.detect(text)
-        print(f"\n{description}:")
-        print(f"  Text: {text}")
+        log.info("%s:", description)
+        log.info("  Text: %s", text)
         if matches:
-            print(f"  [OK] Found {len(matches)} PII match(es):")
+            log.info("  [OK] Found %s PII match(es):", len(matches))
             for match in matches:
-                print(f"    - {match.pii_type.value}: {match.value} (confidence: {match.confidence:.2f})")
+                log.info("    - %s: %s (confidence: %.2f)", match.pii_type.value, match.value, match.confidence)
         else:
-            print(f"  No PII detected")
+            log.info("  No PII detected")
+    
+    # Batch scanning agrees with detect(), including on a large OCR blob
+    page = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20
+    blob = page * 1000 + "SSN: 123-45-6789 " + page * 1000  # ~2 MB
+    texts = [text for text, _ in test_cases] + [blob, page]
+    batch = detector.scan_batch(texts)
+    assert batch == [detector.detect(text) for text in texts]
+    assert [match.pii_type.value for match in batch[-2]] == ["ssn"]
+    assert batch[-1] == []
     
     # Test document scanning with escalation
-    print("\n\nTesting document scanning with confidentiality escalation:")
+    log.info("Testing document scanning with confidentiality escalation:")
     document = {
         'page_id': 'TEST_DOC',
         'ocr_text': 'Patient record: John Doe, SSN: 987-65-4321, DOB: 05/20/1985',
         'confidentiality_level': 1  # Internal
     }
     
-    print(f"Original confidentiality: {document['confidentiality_level']}")
+    log.info("Original confidentiality: %s", document['confidentiality_level'])
     result = detector.scan_document(document)
     
-    print(f"PII found: {result['has_pii']}")
-    print(f"PII types: {result['pii_types']}")
-    print(f"Escalated: {result['escalated']}")
+    log.info("PII found: %s", result['has_pii'])
+    log.info("PII types: %s", result['pii_types'])
+    log.info("Escalated: %s", result['escalated'])
     if result['escalated']:
-        print(f"New confidentiality: {result['new_confidentiality']}")
+        log.info("New confidentiality: %s", result['new_confidentiality'])
     
     # Test redaction
-    print("\n\nTesting PII redaction:")
+    log.info("Testing PII redaction:")
     original = "Contact me at john.doe@example.com or 555-123-4567"
     redacted = detector.redact_pii(original)
-    print(f"Original: {original}")
-    print(f"Redacted: {redacted}")
+    log.info("Original: %s", original)
+    log.info("Redacted: %s", redacted)
     
-    print("\n[OK] PII detection tests completed")
+    log.info("[OK] PII detection tests completed")
 
 
-def test_audit_logging():
+def test_audit_logging(audit_logger):
     """Test audit logging."""
-    print("\n=== Testing Audit Logging ===")
+    log.info("=== Testing Audit Logging ===")
     
-    logger = AuditLogger(db_path="data/test_audit.db")
+    logger = audit_logger
     
     # Log some test events
-    print("\nLogging test events...")
-    logger.log_access(
-        user_id="user_001",
-        username="john_doe",
-        action="view",
-        document_id="DOC001",
-        allowed=True,
-        ip_address="192.168.1.100"
-    )
-    
-    logger.log_access(
-        user_id="user_002",
-        username="jane_smith",
-        action="download",
-        document_id="DOC002",
-        allowed=False,
-        ip_address="192.168.1.101"
-    )
+    log.info("Logging test events...")
+    with logger.batch():
+        logger.log_many([
+            dict(
+                user_id="user_001",
+                username="john_doe",
+                action="view",
+                document_id="DOC001",
+                allowed=True,
+                ip_address="192.168.1.100"
+            ),
+            dict(
+                user_id="user_002",
+                username="jane_smith",
+                action="download",
+                document_id="DOC002",
+                allowed=False,
+                ip_address="192.168.1.101"
+            ),
+        ])
+        
+        logger.log_search(
+            user_id="user_001",
+            username="john_doe",
+            search_query="invoice",
+            results_count=25,
+            ip_address="192.168.1.100"
+        )
     
-    logger.log_search(
-        user_id="user_001",
-        username="john_doe",
-        search_query="invoice",
-        results_count=25,
-        ip_address="192.168.1.100"
-    )
+    log.info("[OK] Logged 3 events")
     
-    print("[OK] Logged 3 events")
+    assert logger.verify_chain() is None
     
     # Get statistics
-    print("\nAudit statistics:")
+    log.info("Audit statistics:")
     stats = logger.get_statistics()
-    print(f"  Total events: {stats['total_events']}")
-    print(f"  By action: {stats['by_action']}")
-    print(f"  Denied events: {stats['denied_count']}")
+    log.info("  Total events: %s", stats['total_events'])
+    log.info("  By action: %s", stats['by_action'])
+    log.info("  Denied events: %s", stats['denied_count'])
     
     # Get user activity
-    print("\nUser activity for john_doe:")
+    log.info("User activity for john_doe:")
     events = logger.get_user_activity("user_001", limit=5)
     for event in events:
-        print(f"  - {event['action']} on {event['resource_id']} at {event['timestamp']}")
+        log.info("  - %s on %s at %s", event['action'], event['resource_id'], event['timestamp'])
     
-    logger.close()
-    print("\n[OK] Audit logging tests completed")
+    log.info("[OK] Audit logging tests completed")
 
 
-def test_encryption():
+def test_encryption(tmp_path):
     """Test encryption."""
-    print("\n=== Testing Encryption ===")
+    log.info("=== Testing Encryption ===")
     
-    try:
-        mgr = EncryptionManager(key_file="data/test_encryption_key.bin")
-        
-        # Test text encryption
-        print("\nTesting text encryption:")
-        original_text = "This is a confidential document with sensitive information."
-        encrypted_text = mgr.encrypt_text(original_text, context="test_doc")
-        decrypted_text = mgr.decrypt_text(encrypted_text, context="test_doc")
-        
-        print(f"  Original:  {original_text}")
-        print(f"  Encrypted: {encrypted_text[:50]}...")
-        print(f"  Decrypted: {decrypted_text}")
-        
-        if original_text == decrypted_text:
-            print("  [OK] Encryption/decryption successful")
-        else:
-            print("  [X] Encryption/decryption failed")
-        
-        # Test file encryption
-        print("\nTesting file encryption:")
-        test_file = Path("data/test_file.txt")
-        test_file.parent.mkdir(parents=True, exist_ok=True)
-        test_file.write_text("This is a test file with sensitive data.")
-        
-        metadata = mgr.encrypt_file(test_file, document_id="test_file")
-        print(f"  [OK] File encrypted: {metadata['output_path']}")
-        print(f"    Original size: {metadata['original_size']} bytes")
-        print(f"    Encrypted size: {metadata['encrypted_size']} bytes")
-        
-        decrypted_path = mgr.decrypt_file(
-            Path(metadata['output_path']),
-            document_id="test_file"
-        )
-        print(f"  [OK] File decrypted: {decrypted_path}")
-        
-        # Verify content
-        if test_file.read_text() == decrypted_path.read_text():
-            print("  [OK] File content verified")
-        else:
-            print("  [X] File content mismatch")
-        
-        print("\n[OK] Encryption tests completed")
-        
-    except ImportError as e:
-        print(f"\n⊘ Encryption tests skipped: {e}")
-        print("  Install cryptography: pip install cryptography")
-
-
-def main():
-    """Run all tests."""
-    print("=" * 60)
-    print("Authorization Layer Tests")
-    print("=" * 60)
-    
-    tests = [
-        test_user_management,
-        test_policy_engine,
-        test_pii_detection,
-        test_audit_logging,
-        test_encryption,
-    ]
+    pytest.importorskip("cryptography")
     
-    for test in tests:
-        try:
-            test()
-        except Exception as e:
-            print(f"\n[X] Test failed with error: {e}")
-            import traceback
-            traceback.print_exc()
-    
-    print("\n" + "=" * 60)
-    print("All tests completed")
-    print("=" * 60)
-
-
-if __name__ == "__main__":
-    main()
+    mgr = EncryptionManager(key_file=tmp_path / "key.bin")
+    
+    # Test text encryption
+    log.info("Testing text encryption:")
+    original_text = "This is a confidential document with sensitive information."
+    encrypted_text = mgr.encrypt_text(original_text, context="test_doc")
+    decrypted_text = mgr.decrypt_text(encrypted_text, context="test_doc")
+    
+    log.info("  Original:  %s", original_text)
+    log.info("  Encrypted: %s...", encrypted_text[:50])
+    log.info("  Decrypted: %s", decrypted_text)
+    
+    assert decrypted_text == original_text
+    log.info("  [OK] Encryption/decryption successful")
+    
+    # Test file encryption
+    log.info("Testing file encryption:")
+    test_file = tmp_path / "test_file.txt"
+    test_file.write_text("This is a test file with sensitive data.")
+    
+    metadata = mgr.encrypt_file(test_file, document_id="test_file")
+    log.info("  [OK] File encrypted: %s", metadata['output_path'])
+    log.info("    Original size: %s bytes", metadata['original_size'])
+    log.info("    Encrypted size: %s bytes", metadata['encrypted_size'])
+    
+    decrypted_path = mgr.decrypt_file(
+        Path(metadata['output_path']),
+        document_id="test_file"
+    )
+    log.info("  [OK] File decrypted: %s", decrypted_path)
+    
+    # Verify content
+    assert decrypted_path.read_text() == test_file.read_text()
+    log.info("  [OK] File content verified")
+    
+    log.info("[OK] Encryption tests completed")
 
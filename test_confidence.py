@@ -1,8 +1,17 @@
 import os
 from pathlib import Path
+
+import pytest
+
 from src.processing.processing import RawArtifact, ProcessingContext, build_default_pipeline
 
 
+@pytest.fixture(scope="session")
+def stub_pipeline():
+    """Default pipeline with the stub OCR engine, built once and shared."""
+    return build_default_pipeline(engine_preference="stub")
+
+
 def make_dummy_ocr_file(tmp_path: Path, text: str) -> Path:
     p = tmp_path / "sample_cleaned.png"  # pretend cleaned image exists for path coherence
     p.write_bytes(b"PNG")  # minimal placeholder bytes
@@ -11,35 +20,24 @@ def make_dummy_ocr_file(tmp_path: Path, text: str) -> Path:
     return ocr
 
 
-def test_confidence_invoice(tmp_path):
-    text = "Invoice Number: INV-1234\nTotal: $123.45\n2025-11-08\nThank you"  # invoice keywords
+@pytest.mark.parametrize("page_id,text,expected_type,min_confidence,required_fields", [
+    ("p1", "Invoice Number: INV-1234\nTotal: $123.45\n2025-11-08\nThank you", "invoice", 0, []),
+    # id confidence is at least base + id_kw weight
+    ("p2", "Passport ID#: P-998877\nDOB: 1990-01-02\nJane Doe", "id", 0.2, ["id_number", "dob", "name"]),
+])
+def test_confidence(tmp_path, stub_pipeline, page_id, text, expected_type, min_confidence, required_fields):
     ocr_path = make_dummy_ocr_file(tmp_path, text)
-    artifact = RawArtifact(page_id="p1", storage_ref=str(ocr_path.with_name("sample.png")))
+    artifact = RawArtifact(page_id=page_id, storage_ref=str(ocr_path.with_name(f"{page_id}.png")))
     artifact.ocr_text_ref = str(ocr_path)
-    pipeline = build_default_pipeline(engine_preference="stub")
-    ctx = ProcessingContext(batch_id="b1", operator_id="op1")
-    structured = pipeline.run([artifact], ctx)[0]
+    ctx = ProcessingContext(batch_id=f"b-{page_id}", operator_id="op1")
+    structured = stub_pipeline.run([artifact], ctx)[0]
     class_meta = structured.raw_metadata.get("processing", {}).get("classification", {})
+    assert class_meta.get("document_type") == expected_type
     assert class_meta.get("confidence") is not None
-    assert 0 <= class_meta.get("confidence") <= 1
+    assert min_confidence <= class_meta.get("confidence") <= 1
     fields_conf = structured.extracted_fields.get("_field_confidence", {})
     assert fields_conf, "field confidence mapping should exist"
     for v in fields_conf.values():
         assert 0 <= v <= 1
-
-
-def test_confidence_id(tmp_path):
-    text = "Passport ID#: P-998877\nDOB: 1990-01-02\nJane Doe"  # id keywords
-    ocr_path = make_dummy_ocr_file(tmp_path, text)
-    artifact = RawArtifact(page_id="p2", storage_ref=str(ocr_path.with_name("sample2.png")))
-    artifact.ocr_text_ref = str(ocr_path)
-    pipeline = build_default_pipeline(engine_preference="stub")
-    ctx = ProcessingContext(batch_id="b2", operator_id="op2")
-    structured = pipeline.run([artifact], ctx)[0]
-    class_meta = structured.raw_metadata.get("processing", {}).get("classification", {})
-    assert class_meta.get("document_type") == "id"
-    assert class_meta.get("confidence") >= 0.2  # base + id_kw weight
-    fields_conf = structured.extracted_fields.get("_field_confidence", {})
-    assert fields_conf.get("id_number") is not None
-    assert fields_conf.get("dob") is not None
-    assert fields_conf.get("name") is not None
+    for field in required_fields:
+        assert fields_conf.get(field) is not None
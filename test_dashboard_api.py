@@ -3,6 +3,12 @@ import pytest
 from pathlib import Path
 from datetime import datetime, timedelta
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Mock Flask if not installed for testing purposes
 try:
     from dashboard_api import app, load_audit_entries, compute_summary, AUDIT_DIR
@@ -15,20 +21,29 @@ except ImportError:
 def create_sample_audit_log(tmp_path: Path, filename: str, entries: list) -> Path:
     """Helper to create sample audit JSONL file."""
     log_path = tmp_path / filename
-    with log_path.open("w", encoding="utf-8") as f:
-        for entry in entries:
-            f.write(json.dumps(entry) + "\n")
+    if ORJSON_AVAILABLE:
+        with log_path.open("wb") as f:
+            f.writelines(orjson.dumps(entry) + b"\n" for entry in entries)
+    else:
+        with log_path.open("w", encoding="utf-8") as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in entries)
     return log_path
 
 
-@pytest.fixture
-def sample_logs(tmp_path, monkeypatch):
-    """Create sample audit logs for testing."""
+@pytest.fixture(scope="module")
+def client():
+    """Flask test client shared by the endpoint tests."""
+    with app.test_client() as c:
+        yield c
+
+
+@pytest.fixture(scope="module")
+def sample_logs(tmp_path_factory):
+    """Create sample audit logs once, shared by the endpoint tests."""
     if not FLASK_AVAILABLE:
+        yield
         return
-    # Mock AUDIT_DIR to tmp_path
-    import dashboard_api
-    monkeypatch.setattr(dashboard_api, "AUDIT_DIR", tmp_path)
+    tmp_path = tmp_path_factory.mktemp("audit")
     
     now = datetime.utcnow()
     yesterday = now - timedelta(days=1)
@@ -79,13 +94,16 @@ def sample_logs(tmp_path, monkeypatch):
     ]
     create_sample_audit_log(tmp_path, f"routing_audit_{yesterday.strftime('%Y-%m-%d')}.jsonl", yesterday_entries)
     
-    return tmp_path
+    # Point AUDIT_DIR at the sample logs for the module's tests
+    import dashboard_api
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(dashboard_api, "AUDIT_DIR", tmp_path)
+        yield tmp_path
 
 
 @pytest.mark.skipif(not FLASK_AVAILABLE, reason="Flask not installed")
-def test_health_endpoint(sample_logs):
+def test_health_endpoint(client, sample_logs):
     """Test /api/health endpoint."""
-    client = app.test_client()
     response = client.get("/api/health")
     assert response.status_code == 200
     data = response.get_json()
@@ -94,9 +112,8 @@ def test_health_endpoint(sample_logs):
 
 
 @pytest.mark.skipif(not FLASK_AVAILABLE, reason="Flask not installed")
-def test_summary_endpoint(sample_logs):
+def test_summary_endpoint(client, sample_logs):
     """Test /api/routing/summary endpoint."""
-    client = app.test_client()
     response = client.get("/api/routing/summary?days=2")
     assert response.status_code == 200
     data = response.get_json()
@@ -109,9 +126,8 @@ def test_summary_endpoint(sample_logs):
 
 
 @pytest.mark.skipif(not FLASK_AVAILABLE, reason="Flask not installed")
-def test_summary_with_filters(sample_logs):
+def test_summary_with_filters(client, sample_logs):
     """Test /api/routing/summary with filters."""
-    client = app.test_client()
     response = client.get("/api/routing/summary?days=2&doc_type=invoice")
     assert response.status_code == 200
     data = response.get_json()
@@ -120,9 +136,8 @@ def test_summary_with_filters(sample_logs):
 
 
 @pytest.mark.skipif(not FLASK_AVAILABLE, reason="Flask not installed")
-def test_recent_endpoint(sample_logs):
+def test_recent_endpoint(client, sample_logs):
     """Test /api/routing/recent endpoint."""
-    client = app.test_client()
     response = client.get("/api/routing/recent?limit=10")
     assert response.status_code == 200
     data = response.get_json()
@@ -136,9 +151,8 @@ def test_recent_endpoint(sample_logs):
 
 
 @pytest.mark.skipif(not FLASK_AVAILABLE, reason="Flask not installed")
-def test_trends_endpoint(sample_logs):
+def test_trends_endpoint(client, sample_logs):
     """Test /api/routing/trends endpoint."""
-    client = app.test_client()
     response = client.get("/api/routing/trends?days=7")
     assert response.status_code == 200
     data = response.get_json()
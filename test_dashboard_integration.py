@@ -3,34 +3,163 @@
 Test Dashboard API Integration
 
 Tests the Organization Layer endpoints in the dashboard API.
+
+Needs a running server (python dashboard_api.py --port 8080). Run with
+pytest (pytest -n auto test_dashboard_integration.py) or as a script.
 """
+import argparse
+import functools
+import os
+import pytest
 import requests
+import sys
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from requests_cache import CachedSession
+    REQUESTS_CACHE_AVAILABLE = True
+except ImportError:
+    REQUESTS_CACHE_AVAILABLE = False
 
 
 BASE_URL = "http://127.0.0.1:8080"
 
+# Full response bodies are printed when someone is watching: by default only
+# on a terminal (not under pytest capture or CI logs). DASHBOARD_TEST_VERBOSE=1/0
+# or -v overrides.
+VERBOSE = os.environ.get("DASHBOARD_TEST_VERBOSE", "1" if sys.stdout.isatty() else "0") == "1"
+
+# Sample archive batch used by the thumbnail and merge tests
+BATCH_PAYLOAD = {
+    "owner": "SampleCorp",
+    "year": 2024,
+    "doc_type": "Invoice",
+    "batch_id": "batch_test_001"
+}
+
+
+def _make_session(cache: bool = False) -> requests.Session:
+    """
+    Build the HTTP session shared by every test.
+    
+    Args:
+        cache: Cache GET responses in a local SQLite file for 60 seconds
+            (requires requests-cache); POSTs always reach the server
+    
+    Returns:
+        Session with a keep-alive connection pool
+    """
+    if cache:
+        session = CachedSession(
+            "dashboard_tests",
+            backend="sqlite",
+            expire_after=60,
+            allowable_methods=("GET",)
+        )
+    else:
+        session = requests.Session()
+    # Retry dropped connections and gateway errors in place instead of
+    # failing the test; POSTs are only retried if they never reached the server
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 504), raise_on_status=False)
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+    return session
+
+
+# One keep-alive connection pool shared by every test
+SESSION = _make_session()
+
+
+@pytest.fixture(scope="session")
+def session():
+    """Shared pooled session, once the API has answered its health check."""
+    SESSION.get(f"{BASE_URL}/api/health").raise_for_status()
+    return SESSION
+
+
+def _wait_ready(timeout: float = 5.0) -> None:
+    """
+    Poll /api/health with exponential backoff until the API answers.
+    
+    Args:
+        timeout: Seconds to keep polling before giving up
+    
+    Raises:
+        RuntimeError: If the API does not answer within the timeout
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        try:
+            # Plain request: the session's retry backoff would slow the polling down
+            if requests.get(f"{BASE_URL}/api/health", timeout=0.5).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+    raise RuntimeError(f"Dashboard API not ready at {BASE_URL}")
+
+
+@pytest.fixture(scope="session")
+def sample_batch():
+    """Payload naming the sample archive batch; skips the batch tests when it is absent."""
+    if not _batch_exists(**BATCH_PAYLOAD):
+        pytest.skip("test batch not found")
+    return BATCH_PAYLOAD
+
+
+def _json(response: requests.Response) -> Any:
+    """Decode a JSON response body, with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
 
-def test_health():
+def _pretty(data: Any) -> str:
+    """Indented JSON for printing."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
+
+@functools.lru_cache(maxsize=None)
+def _batch_exists(owner: str, year: int, doc_type: str, batch_id: str) -> bool:
+    """Whether a batch folder exists in the local archive (checked once per batch)."""
+    return (Path("data/archive") / owner / str(year) / doc_type / batch_id).is_dir()
+
+
+def test_health(session):
     """Test health endpoint."""
     print("\n=== Testing Health Endpoint ===")
-    response = requests.get(f"{BASE_URL}/api/health")
+    response = session.get(f"{BASE_URL}/api/health")
     print(f"Status: {response.status_code}")
-    print(f"Response: {response.json()}")
+    data = _json(response)
+    print(f"Response: {data}")
     assert response.status_code == 200
-    assert response.json()["status"] == "ok"
+    assert data["status"] == "ok"
     print("✓ Health check passed")
 
 
-def test_archive_stats():
+def test_archive_stats(session):
     """Test archive statistics endpoint."""
     print("\n=== Testing Archive Stats ===")
-    response = requests.get(f"{BASE_URL}/api/archive/stats")
+    response = session.get(f"{BASE_URL}/api/archive/stats")
     print(f"Status: {response.status_code}")
-    data = response.json()
-    print(f"Response: {json.dumps(data, indent=2)}")
+    data = _json(response)
+    if VERBOSE:
+        print(f"Response: {_pretty(data)}")
     
     if response.status_code == 200:
         print(f"✓ Total documents: {data['statistics']['total_documents']}")
@@ -41,97 +170,67 @@ def test_archive_stats():
         print(f"✗ Failed: {data.get('error', 'Unknown error')}")
 
 
-def test_archive_search():
+def test_archive_search(session):
     """Test archive search endpoint."""
     print("\n=== Testing Archive Search ===")
     
     # Search without filters
-    response = requests.get(f"{BASE_URL}/api/archive/search")
+    response = session.get(f"{BASE_URL}/api/archive/search")
     print(f"Status: {response.status_code}")
-    data = response.json()
+    data = _json(response)
     print(f"Found {data.get('count', 0)} documents")
     
     if data.get('count', 0) > 0:
         print(f"First result: {data['results'][0]['page_id']}")
     
     # Search with text filter
-    response = requests.get(f"{BASE_URL}/api/archive/search?text=invoice&limit=5")
-    data = response.json()
+    response = session.get(f"{BASE_URL}/api/archive/search?text=invoice&limit=5")
+    data = _json(response)
     print(f"Text search 'invoice': {data.get('count', 0)} results")
     
     print("✓ Search endpoint working")
 
 
-def test_archive_owners():
-    """Test archive owners endpoint."""
-    print("\n=== Testing Archive Owners ===")
-    response = requests.get(f"{BASE_URL}/api/archive/owners")
+def test_archive_facets(session):
+    """Test archive owners, doc types and years in one request."""
+    print("\n=== Testing Archive Facets ===")
+    response = session.get(f"{BASE_URL}/api/archive/facets")
     print(f"Status: {response.status_code}")
-    data = response.json()
+    data = _json(response)
     print(f"Owners: {data.get('owners', [])}")
-    print("✓ Owners endpoint working")
-
-
-def test_archive_doc_types():
-    """Test archive document types endpoint."""
-    print("\n=== Testing Archive Doc Types ===")
-    response = requests.get(f"{BASE_URL}/api/archive/doc_types")
-    print(f"Status: {response.status_code}")
-    data = response.json()
     print(f"Doc Types: {data.get('doc_types', [])}")
-    print("✓ Doc types endpoint working")
-
-
-def test_archive_years():
-    """Test archive years endpoint."""
-    print("\n=== Testing Archive Years ===")
-    response = requests.get(f"{BASE_URL}/api/archive/years")
-    print(f"Status: {response.status_code}")
-    data = response.json()
     print(f"Years: {data.get('years', [])}")
-    print("✓ Years endpoint working")
+    print("✓ Facets endpoint working")
 
 
-def test_thumbnail_stats():
+def test_thumbnail_stats(session):
     """Test thumbnail cache stats endpoint."""
     print("\n=== Testing Thumbnail Cache Stats ===")
-    response = requests.get(f"{BASE_URL}/api/archive/thumbnail/cache/stats")
+    response = session.get(f"{BASE_URL}/api/archive/thumbnail/cache/stats")
     print(f"Status: {response.status_code}")
-    data = response.json()
+    data = _json(response)
     
     if response.status_code == 200:
-        print(f"Cache stats: {json.dumps(data['cache_stats'], indent=2)}")
+        if VERBOSE:
+            print(f"Cache stats: {_pretty(data['cache_stats'])}")
         print("✓ Thumbnail stats endpoint working")
     else:
         print(f"✗ Failed: {data.get('error', 'Unknown error')}")
 
 
-def test_thumbnail_generation():
+def test_thumbnail_generation(session, sample_batch):
     """Test thumbnail generation endpoint (requires existing batch)."""
     print("\n=== Testing Thumbnail Generation ===")
     
-    # Check if test batch exists
-    batch_folder = Path("data/archive/SampleCorp/2024/Invoice/batch_test_001")
-    if not batch_folder.exists():
-        print("⊘ Skipping - test batch not found")
-        return
-    
-    payload = {
-        "owner": "SampleCorp",
-        "year": 2024,
-        "doc_type": "Invoice",
-        "batch_id": "batch_test_001",
-        "force": False
-    }
-    
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}/api/archive/thumbnails/generate",
-        json=payload
+        json={**sample_batch, "force": False}
     )
     
     print(f"Status: {response.status_code}")
-    data = response.json()
-    print(f"Response: {json.dumps(data, indent=2)}")
+    data = _json(response)
+    if VERBOSE:
+        print(f"Response: {_pretty(data)}")
     
     if response.status_code == 200:
         print("✓ Thumbnail generation endpoint working")
@@ -139,31 +238,19 @@ def test_thumbnail_generation():
         print(f"✗ Failed: {data.get('error', 'Unknown error')}")
 
 
-def test_pdf_merge():
+def test_pdf_merge(session, sample_batch):
     """Test PDF merge endpoint (requires existing batch)."""
     print("\n=== Testing PDF Merge ===")
     
-    # Check if test batch exists
-    batch_folder = Path("data/archive/SampleCorp/2024/Invoice/batch_test_001")
-    if not batch_folder.exists():
-        print("⊘ Skipping - test batch not found")
-        return
-    
-    payload = {
-        "owner": "SampleCorp",
-        "year": 2024,
-        "doc_type": "Invoice",
-        "batch_id": "batch_test_001"
-    }
-    
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}/api/archive/merge",
-        json=payload
+        json=sample_batch
     )
     
     print(f"Status: {response.status_code}")
-    data = response.json()
-    print(f"Response: {json.dumps(data, indent=2)}")
+    data = _json(response)
+    if VERBOSE:
+        print(f"Response: {_pretty(data)}")
     
     if response.status_code == 200:
         print("✓ PDF merge endpoint working")
@@ -171,13 +258,13 @@ def test_pdf_merge():
         print(f"✗ Failed: {data.get('error', 'Unknown error')}")
 
 
-def test_archive_document():
+def test_archive_document(session):
     """Test document retrieval endpoint."""
     print("\n=== Testing Archive Document Retrieval ===")
     
     # First get a document from search
-    response = requests.get(f"{BASE_URL}/api/archive/search?limit=1")
-    data = response.json()
+    response = session.get(f"{BASE_URL}/api/archive/search?limit=1")
+    data = _json(response)
     
     if data.get('count', 0) == 0:
         print("⊘ Skipping - no documents found")
@@ -186,12 +273,13 @@ def test_archive_document():
     page_id = data['results'][0]['page_id']
     print(f"Testing with page_id: {page_id}")
     
-    response = requests.get(f"{BASE_URL}/api/archive/document/{page_id}")
+    response = session.get(f"{BASE_URL}/api/archive/document/{page_id}")
     print(f"Status: {response.status_code}")
-    data = response.json()
+    data = _json(response)
     
     if response.status_code == 200:
-        print(f"Document: {json.dumps(data['document'], indent=2)}")
+        if VERBOSE:
+            print(f"Document: {_pretty(data['document'])}")
         print("✓ Document retrieval working")
     else:
         print(f"✗ Failed: {data.get('error', 'Unknown error')}")
@@ -199,23 +287,54 @@ def test_archive_document():
 
 def main():
     """Run all tests."""
+    global SESSION, VERBOSE
+    
+    parser = argparse.ArgumentParser(description="Dashboard API integration tests")
+    parser.add_argument("--cache", action="store_true",
+                        help="Cache GET responses for 60s between runs (requires requests-cache)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Clear the response cache before running")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Print full response bodies")
+    args = parser.parse_args()
+    
+    if args.verbose:
+        VERBOSE = True
+    
+    if args.cache:
+        if REQUESTS_CACHE_AVAILABLE:
+            SESSION = _make_session(cache=True)
+            if args.fresh:
+                SESSION.cache.clear()
+        else:
+            print("requests-cache not installed; running without response cache")
+    
     print("=" * 60)
     print("Dashboard API Integration Tests")
     print("=" * 60)
     print("\nMake sure the dashboard API is running:")
     print("  python dashboard_api.py --port 8080")
-    print("\nWaiting 3 seconds for confirmation...")
-    time.sleep(3)
+    print("\nWaiting for the API health check...")
+    _wait_ready()
+    
+    # One request first so the server's lazy archive-indexer import and
+    # database setup happen once, not in every thread of the first wave
+    try:
+        SESSION.get(f"{BASE_URL}/api/archive/search?limit=1")
+    except requests.RequestException:
+        pass
     
+    # Read-only tests run concurrently; each one waits on the server
     tests = [
         test_health,
         test_archive_stats,
-        test_archive_owners,
-        test_archive_doc_types,
-        test_archive_years,
+        test_archive_facets,
         test_archive_search,
         test_archive_document,
         test_thumbnail_stats,
+    ]
+    # These write to the archive, so they run one at a time afterwards
+    serial_tests = [
         test_thumbnail_generation,
         test_pdf_merge,
     ]
@@ -223,13 +342,29 @@ def main():
     passed = 0
     failed = 0
     
-    for test in tests:
-        try:
-            test()
-            passed += 1
-        except Exception as e:
-            print(f"✗ Test failed: {e}")
-            failed += 1
+    try:
+        with ThreadPoolExecutor(max_workers=min(8, len(tests))) as executor:
+            futures = {executor.submit(test, SESSION): test.__name__ for test in tests}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    passed += 1
+                except Exception as e:
+                    print(f"✗ Test failed ({futures[future]}): {e}")
+                    failed += 1
+        
+        if _batch_exists(**BATCH_PAYLOAD):
+            for test in serial_tests:
+                try:
+                    test(SESSION, BATCH_PAYLOAD)
+                    passed += 1
+                except Exception as e:
+                    print(f"✗ Test failed: {e}")
+                    failed += 1
+        else:
+            print("\n⊘ Skipping batch tests - test batch not found")
+    finally:
+        SESSION.close()
     
     print("\n" + "=" * 60)
     print(f"Results: {passed} passed, {failed} failed")
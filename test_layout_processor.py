@@ -2,31 +2,49 @@ from pathlib import Path
 from src.processing.processing import RawArtifact, ProcessingContext, build_default_pipeline
 
 try:
-    from PIL import Image, ImageDraw  # type: ignore
+    import numpy as np
+    from PIL import Image  # type: ignore
 except Exception:
     Image = None  # type: ignore
 
 
 def _make_table_signature_image(path: Path):
-    img = Image.new("RGB", (800, 1000), color=(255, 255, 255))
-    d = ImageDraw.Draw(img)
+    # Drawn straight into a pixel array; matches the PIL ImageDraw rendering
+    # of the same rectangle, grid lines and stroke pixel for pixel
+    arr = np.full((1000, 800, 3), 255, dtype=np.uint8)
     # Draw table (grid) top half
     left, top = 50, 80
     right, bottom = 750, 400
-    # Outer rectangle
-    d.rectangle([left, top, right, bottom], outline=(0,0,0), width=3)
-    # Vertical lines
+    # Outer rectangle (3px border)
+    arr[top:bottom+1, left:left+3] = 0
+    arr[top:bottom+1, right-2:right+1] = 0
+    arr[top:top+3, left:right+1] = 0
+    arr[bottom-2:bottom+1, left:right+1] = 0
+    # Vertical lines (2px)
     for x in range(left+140, right, 140):
-        d.line([x, top, x, bottom], fill=(0,0,0), width=2)
-    # Horizontal lines
+        arr[top:bottom+1, x:x+2] = 0
+    # Horizontal lines (2px)
     for y in range(top+64, bottom, 64):
-        d.line([left, y, right, y], fill=(0,0,0), width=2)
-    # Signature stroke near bottom
+        arr[y:y+2, left:right+1] = 0
+    # Signature stroke near bottom: 120 short 1px segments rasterized at once,
+    # stepping along each segment's major axis with ties rounded toward its end
     sig_top = 850
     sig_left = 200
-    for i in range(120):
-        d.line([sig_left + i*3, sig_top + (i % 5), sig_left + i*3 + 2, sig_top + (i % 7)], fill=(0,0,0), width=1)
-    img.save(path)
+    i = np.arange(120)
+    x0, y0 = sig_left + i*3, sig_top + (i % 5)
+    dx, dy = np.full(120, 2), (i % 7) - (i % 5)
+    steps = np.maximum(abs(dx), abs(dy))[:, None]
+    k = np.arange(steps.max() + 1)[None, :]
+    on_segment = k <= steps
+
+    def _offsets(d):
+        v = k * d[:, None] / steps
+        return np.where(d[:, None] > 0, np.floor(v + 0.5), np.ceil(v - 0.5)).astype(int)
+
+    xs = x0[:, None] + _offsets(dx)
+    ys = y0[:, None] + _offsets(dy)
+    arr[ys[on_segment], xs[on_segment]] = 0
+    Image.fromarray(arr).save(path)
 
 
 def test_layout_detection_regions(tmp_path):
@@ -4,9 +4,12 @@ Test suite for document summarizer.
 Tests extractive, abstractive, and hybrid summarization on various document types.
 """
 
+import importlib.util
 import sys
 from pathlib import Path
 
+import pytest
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
@@ -445,6 +448,40 @@ def test_quality_metrics():
     print()
 
 
+def test_save_to_csv_large_batch(tmp_path, monkeypatch):
+    """CSV export spans several pyarrow record batches and matches csv.DictWriter."""
+    pytest.importorskip("pyarrow")
+    import summarize_cli
+    
+    rows = [
+        {
+            'file': f'docs/{i}.txt',
+            'filename': f'{i}.txt',
+            'summary': 'Total due, "net 30"' if i % 2 else 'Plain summary',
+            'confidence': 0.5 + i / 10000,
+            'summary_words': 10,
+            # Whole-number floats must keep their ".0" in both writers
+            'reduction': float(i % 3 * 45),
+            'doc_type': None if i % 7 == 0 else 'invoice',
+            'bullet_points': '',
+        }
+        for i in range(summarize_cli.CSV_BATCH_SIZE * 2 + 500)
+    ]
+    
+    arrow_csv = tmp_path / "arrow.csv"
+    assert summarize_cli.save_to_csv(rows, str(arrow_csv)) == len(rows)
+    
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(
+        importlib.util, "find_spec",
+        lambda name, *args: None if name == 'pyarrow' else find_spec(name, *args)
+    )
+    plain_csv = tmp_path / "plain.csv"
+    assert summarize_cli.save_to_csv(rows, str(plain_csv)) == len(rows)
+    
+    assert arrow_csv.read_bytes() == plain_csv.read_bytes()
+
+
 if __name__ == '__main__':
     print("Starting Document Summarizer Test Suite...")
     print()